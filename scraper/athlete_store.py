@@ -0,0 +1,68 @@
+"""
+Persistent userId -> athlete name index shared by every competition and run.
+
+Lets the scraper skip /competitions/{id}/athletes when the protocol only
+contains athletes it has already seen in another category or event.
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable
+
+# Stay well below SQLite's bound-parameter limit.
+_LOOKUP_CHUNK = 500
+
+
+class AthleteStore:
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS athletes (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+
+    def lookup(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Return {userId: name} for the ids the store knows; unknown ids are left out.
+        """
+        ids = list(dict.fromkeys(user_ids))
+        found: Dict[str, str] = {}
+        with self._lock:
+            for i in range(0, len(ids), _LOOKUP_CHUNK):
+                chunk = ids[i:i + _LOOKUP_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                found.update(
+                    self._db.execute(
+                        f"SELECT user_id, name FROM athletes WHERE user_id IN ({marks})", chunk
+                    )
+                )
+        return found
+
+    def upsert(self, user_map: Dict[str, str]) -> None:
+        if not user_map:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO athletes (user_id, name, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET name = excluded.name, updated_at = excluded.updated_at",
+                [(uid, name, now) for uid, name in user_map.items()],
+            )
+            self._db.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM athletes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for scraper.py against the local mock API.
+
+Every (engine, workers) combination runs in its own subprocess so peak RSS is
+measured per configuration. Reports comps/sec, per-request latency percentiles
+(p50/p95/p99), HTTP status counts and peak RSS.
+
+    python bench.py --comps 60 --workers 2,6,12 --engines threads,async --latency-ms 80
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from instrumentation import percentiles
+from mock_api import add_config_args, config_from_args, serve_in_thread
+
+
+def comp_urls(count: int) -> List[str]:
+    return [f"https://trenvet.allstrongman.com/comp-page;compId={0xbe0000 + i:024x}" for i in range(count)]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One measured scrape, with the response cache and athlete store disabled.
+    """
+    import scraper
+
+    scraper.API_BASE = spec["api_base"]
+    if spec.get("adaptive"):
+        scraper.LIMITER = scraper.AdaptiveLimiter(
+            initial=spec["workers"], max_concurrency=max(scraper.MAX_CONCURRENCY, spec["workers"])
+        )
+    urls = comp_urls(spec["comps"])
+    engine, workers = spec["engine"], spec["workers"]
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    with scraper.make_session(workers) as session:
+        plain_get = session.get
+
+        def timed_get(url: str, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            status = "error"
+            try:
+                r = plain_get(url, **kwargs)
+                status = r.status_code
+                return r
+            finally:
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000.0)
+                    statuses[status] += 1
+
+        session.get = timed_get
+
+        rows = 0
+        failed = 0
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if engine == "async":
+                results = scraper.run_async(session, urls, workers)
+            else:
+                results = scraper.run_threads(session, urls, workers)
+            for _, title, comp_rows in results:
+                rows += len(comp_rows)
+                failed += 0 if title else 1
+        elapsed = time.perf_counter() - started
+
+    return {
+        "engine": engine,
+        "workers": workers,
+        "adaptive": bool(spec.get("adaptive")),
+        "comps": len(urls),
+        "failed_comps": failed,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "comps_per_sec": round(len(urls) / elapsed, 2),
+        "requests": len(latencies),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda x: str(x[0]))},
+        "latency_ms": {k: round(v, 1) for k, v in percentiles(latencies).items()},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"\n{'engine':<13} {'workers':>7} {'comps/s':>8} {'secs':>7} {'reqs':>5} "
+        f"{'p50ms':>7} {'p95ms':>7} {'p99ms':>7} {'rssMB':>6} {'failed':>6}"
+    )
+    for r in results:
+        lat = r["latency_ms"]
+        print(
+            f"{r['engine'] + ('+aimd' if r['adaptive'] else ''):<13} {r['workers']:>7} {r['comps_per_sec']:>8} {r['seconds']:>7} "
+            f"{r['requests']:>5} {lat['p50']:>7} {lat['p95']:>7} {lat['p99']:>7} "
+            f"{r['peak_rss_mb']:>6} {r['failed_comps']:>6}"
+        )
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark scraper engines against the mock API.")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    p.add_argument("--comps", type=int, default=50)
+    p.add_argument("--workers", default="2,6,12", help="comma-separated worker / concurrency values")
+    p.add_argument("--engines", default="threads,async", help="comma-separated: threads,async")
+    p.add_argument("--adaptive", action="store_true", help="run with the shared adaptive limiter")
+    p.add_argument("--api-base", default=None, help="benchmark an already running API instead")
+    p.add_argument("--json", default=None, help="also write results to this file")
+    add_config_args(p)
+    args = p.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    api_base = args.api_base
+    server = None
+    if api_base is None:
+        server, api_base = serve_in_thread(config_from_args(args))
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for engine in args.engines.split(","):
+            for workers in (int(w) for w in args.workers.split(",")):
+                spec = {
+                    "api_base": api_base,
+                    "comps": args.comps,
+                    "engine": engine,
+                    "workers": workers,
+                    "adaptive": args.adaptive,
+                }
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                print(f"[BENCH] {engine} x{workers}: {result['comps_per_sec']} comps/s")
+                results.append(result)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"api_base": api_base, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
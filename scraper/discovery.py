@@ -0,0 +1,106 @@
+"""
+Competition auto-discovery from an event / organizer listing endpoint.
+
+Pages of the listing are fetched concurrently and matching compIds are
+yielded as soon as their page (and every page before it) has arrived, so
+the fetch pipeline can start on them while discovery is still paging and
+the comp order is the listing's order on every run.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from models import Competition
+
+
+class DiscoveryFilter(NamedTuple):
+    since: Optional[str] = None  # YYYY-MM-DD, inclusive
+    until: Optional[str] = None  # YYYY-MM-DD, inclusive
+    title_pattern: Optional[str] = None  # case-insensitive regex
+    categories: Tuple[str, ...] = ()  # limitationGroup values, case-insensitive
+
+
+def _comp_id(comp: Dict[str, Any]) -> str:
+    return str(comp.get("_id") or comp.get("id") or comp.get("compId") or "").strip()
+
+
+def comp_matches(comp: Dict[str, Any], flt: DiscoveryFilter) -> bool:
+    parsed = Competition.from_api(_comp_id(comp), comp)
+    date = parsed.date
+    if flt.since and (not date or date < flt.since):
+        return False
+    if flt.until and (not date or date > flt.until):
+        return False
+    if flt.title_pattern and not re.search(flt.title_pattern, str(comp.get("title", "")), re.IGNORECASE):
+        return False
+    if flt.categories and parsed.category.lower() not in {c.lower() for c in flt.categories}:
+        return False
+    return True
+
+
+def _page_items(obj: Any) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    (competitions, total count if the listing reports one).
+    """
+    if isinstance(obj, list):
+        return obj, None
+    if not isinstance(obj, dict):
+        return [], None
+    items = obj.get("data") or obj.get("competitions") or obj.get("items") or []
+    total = obj.get("total") or obj.get("totalCount") or obj.get("count")
+    return items, int(total) if total is not None else None
+
+
+def page_url(listing_url: str, page: int, page_size: int) -> str:
+    sep = "&" if "?" in listing_url else "?"
+    return f"{listing_url}{sep}{urlencode({'page': page, 'limit': page_size})}"
+
+
+def discover(
+    get_json: Callable[[str], Any],
+    listing_url: str,
+    flt: DiscoveryFilter = DiscoveryFilter(),
+    workers: int = 4,
+    page_size: int = 50,
+) -> Iterator[str]:
+    """
+    Yield matching compIds from a paged listing (1-based `page`, `limit` params).
+
+    When the first page reports a total, all remaining pages are requested at
+    once; otherwise pages are requested `workers` at a time until a short page.
+    """
+    seen: Set[str] = set()
+
+    def matching(items: List[Dict[str, Any]]) -> Iterator[str]:
+        for comp in items:
+            cid = _comp_id(comp)
+            if cid and cid not in seen and comp_matches(comp, flt):
+                seen.add(cid)
+                yield cid
+
+    first, total = _page_items(get_json(page_url(listing_url, 1, page_size)))
+    yield from matching(first)
+    if len(first) < page_size:
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        if total is not None:
+            last = -(-total // page_size)
+            futures = [ex.submit(get_json, page_url(listing_url, p, page_size)) for p in range(2, last + 1)]
+            for fut in futures:
+                yield from matching(_page_items(fut.result())[0])
+            return
+
+        page = 2
+        while True:
+            window = range(page, page + workers)
+            futures = [ex.submit(get_json, page_url(listing_url, p, page_size)) for p in window]
+            exhausted = False
+            for fut in futures:
+                items = _page_items(fut.result())[0]
+                exhausted = exhausted or len(items) < page_size
+                yield from matching(items)
+            if exhausted:
+                return
+            page += workers
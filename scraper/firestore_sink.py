@@ -0,0 +1,199 @@
+"""
+Write scraped competitors straight into exercises/{id}/competitors.
+
+Produces the same documents UploadCompetitorsCSV.tsx creates from a CSV
+(name, normalized category, lane=None, status="waiting", orderRank, createdAt),
+with the same all-or-nothing category validation. Documents are committed in
+batches of up to 500 writes, several batches at a time.
+
+Document ids are <exercise>-<hash of name and category>, so an athlete keeps
+its document across re-runs (e.g. after a failed batch) while the list order
+changes. A re-run only updates name, category and orderRank of documents that
+already exist, never the live lane / status / createdAt. The import refuses
+to start when the collection holds documents it would not write itself
+(a UI upload, or an import of a different list).
+
+Needs `pip install google-cloud-firestore`. Set FIRESTORE_EMULATOR_HOST
+(e.g. localhost:8080) to run against the local Firestore emulator.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from google.cloud import firestore
+except ImportError:  # optional dependency, only needed for --firestore-exercise
+    firestore = None
+
+from models import normalize_category
+
+# Keep in sync with COMPETITOR_CATEGORIES in src/types/competitor.ts
+COMPETITOR_CATEGORIES = (
+    "w1", "n2.2", "n2", "n1.1", "w0",
+    "r1", "r2", "r1/n1", "r1/n2", "r2/n1",
+    "n1", "s1", "n0", "r0", "h2", "h1",
+)
+
+# Firestore's limit of writes per batch.
+MAX_BATCH_OPS = 500
+COMMIT_WORKERS = 4
+
+_VALID = {c.lower() for c in COMPETITOR_CATEGORIES}
+
+
+def project_from_dotenv(path: str) -> Optional[str]:
+    """
+    VITE_FIREBASE_PROJECT_ID from the web app's .env, if present.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if sep and key.strip() == "VITE_FIREBASE_PROJECT_ID":
+                return value.strip() or None
+    return None
+
+
+class FirestoreSink:
+    def __init__(
+        self,
+        exercise_id: str,
+        project: Optional[str] = None,
+        batch_size: int = MAX_BATCH_OPS,
+        workers: int = COMMIT_WORKERS,
+        client: Any = None,
+        sdk: Any = None,
+    ) -> None:
+        """
+        `client` / `sdk` replace firestore.Client and the google.cloud.firestore
+        module (for SERVER_TIMESTAMP), e.g. with fakes.
+        """
+        sdk = sdk if sdk is not None else firestore
+        if client is None:
+            if sdk is None:
+                raise RuntimeError("Firestore sink needs: pip install google-cloud-firestore")
+            client = sdk.Client(project=project)
+        server_timestamp = getattr(client, "SERVER_TIMESTAMP", None) or getattr(sdk, "SERVER_TIMESTAMP", None)
+        if server_timestamp is None:
+            raise RuntimeError("Firestore sink needs a SERVER_TIMESTAMP sentinel from the client or sdk")
+        self.server_timestamp = server_timestamp
+        self.exercise_id = exercise_id
+        self.client = client
+        self.collection = client.collection("exercises", exercise_id, "competitors")
+        self.batch_size = min(batch_size, MAX_BATCH_OPS)
+        self.workers = workers
+        # (document id, data) in orderRank order
+        self._docs: List[Tuple[str, Dict[str, Any]]] = []
+        self._ids: Set[str] = set()
+        # (CSV line number, reason, value) - line numbers match the equivalent CSV file
+        self.invalid: List[Tuple[int, str, str]] = []
+        # (first orderRank, last orderRank, error) of batches that did not commit
+        self.failed: List[Tuple[int, int, str]] = []
+
+    def add(self, rows: List[Tuple[str, str]]) -> None:
+        """
+        Validate and queue unique rows in output order; orderRank is the row's position,
+        i.e. URL order then protocol rank, exactly as the CSV upload assigns it.
+        """
+        for name, raw_category in rows:
+            index = len(self._docs) + len(self.invalid)
+            name = (name or "").strip()
+            category = normalize_category(raw_category)
+            if not name or not category:
+                self.invalid.append((index + 2, "Missing name or category", ""))
+                continue
+            if category not in _VALID:
+                self.invalid.append((index + 2, "Invalid category", raw_category))
+                continue
+            doc_id = self.doc_id(name, category)
+            if doc_id in self._ids:
+                self.invalid.append((index + 2, "Duplicate competitor", name))
+                continue
+            self._ids.add(doc_id)
+            self._docs.append(
+                (
+                    doc_id,
+                    {
+                        "name": name,
+                        "category": category,
+                        "lane": None,
+                        "status": "waiting",
+                        "orderRank": index,
+                    },
+                )
+            )
+
+    def doc_id(self, name: str, category: str) -> str:
+        """
+        Stable per athlete: case and whitespace of the name do not matter.
+        """
+        key = " ".join(name.split()).casefold() + "\n" + category
+        return f"{self.exercise_id}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]}"
+
+    def _commit_chunk(self, docs: List[Tuple[str, Dict[str, Any]]], existing: Set[str]) -> int:
+        batch = self.client.batch()
+        for doc_id, data in docs:
+            doc = self.collection.document(doc_id)
+            if doc_id in existing:
+                # Already imported: the event may be running, keep lane / status / createdAt.
+                update = {"name": data["name"], "category": data["category"], "orderRank": data["orderRank"]}
+                batch.set(doc, update, merge=True)
+            else:
+                batch.set(doc, {**data, "createdAt": self.server_timestamp})
+        batch.commit()
+        return len(docs)
+
+    def commit(self) -> int:
+        """
+        Commit every queued competitor. Nothing is written if any row was invalid.
+        Returns the number of documents written.
+        """
+        if self.invalid:
+            print(f"[ERR] Firestore import aborted: {len(self.invalid)} invalid row(s)")
+            for line, reason, value in self.invalid[:20]:
+                print(f"  row {line}: {reason}" + (f" ({value!r})" if value else ""))
+            return 0
+
+        existing = {ref.id for ref in self.collection.list_documents()}
+        foreign = existing - self._ids
+        if foreign:
+            print(
+                f"[ERR] Firestore import aborted: exercise {self.exercise_id} already has "
+                f"{len(foreign)} competitor(s) from another import; clear its list first"
+            )
+            return 0
+
+        chunks = [
+            self._docs[i:i + self.batch_size] for i in range(0, len(self._docs), self.batch_size)
+        ]
+        written = 0
+        committed: List[Tuple[int, int]] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            futures = {ex.submit(self._commit_chunk, chunk, existing): chunk for chunk in chunks}
+            for fut in as_completed(futures):
+                chunk = futures[fut]
+                first, last = chunk[0][1]["orderRank"], chunk[-1][1]["orderRank"]
+                try:
+                    written += fut.result()
+                    committed.append((first, last))
+                except Exception as e:
+                    self.failed.append((first, last, str(e)))
+        updated = len(existing)
+        if not self.failed:
+            print(
+                f"[OK] Firestore: added {written - updated} competitors, updated {updated} "
+                f"in {len(chunks)} batch(es)"
+            )
+            return written
+        self.failed.sort()
+        print(
+            f"[ERR] Firestore: {len(self.failed)} of {len(chunks)} batch(es) failed, {written} competitors written; "
+            "re-run the import to write the rest"
+        )
+        for first, last in sorted(committed):
+            print(f"  committed orderRank {first}-{last}")
+        for first, last, error in self.failed:
+            print(f"  failed orderRank {first}-{last}: {error}")
+        return written
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Fuzzy duplicate-athlete detection.
+
+Exact (name, category) dedupe misses the same athlete spelled differently
+across competitions: Cyrillic vs Latin, swapped first/last name, case and
+extra whitespace, transliteration variants (Serhii / Sergey, Kh / H).
+
+Every distinct name is reduced to a phonetic skeleton and put into a few
+blocking buckets (pairs of token prefixes, pairs of token suffixes and the
+longest token); only names that share a bucket are scored, so the work grows
+with the number of real candidates rather than with n^2. Matches are grouped
+with union-find; since matching is not transitive (A~B and B~C does not make
+A~C), each group is then split around its most frequent spellings so that
+every member is within the threshold of its cluster's canonical name.
+
+    python fuzzy_dupes.py season/*.csv --threshold 0.9 --merge merged.csv
+"""
+import argparse
+import re
+import string
+import sys
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from output import Row, RowWriter, read_rows
+
+DEFAULT_THRESHOLD = 0.9
+# Buckets bigger than this (e.g. a very common surname prefix) are not expanded pairwise.
+MAX_BLOCK = 300
+# Prefix / suffix length of the token-pair bucket keys.
+BLOCK_AFFIX = 4
+# Every aligned token pair must be at least this similar.
+TOKEN_FLOOR = 0.8
+# Placeholders for athletes without a resolved name; they never match each other.
+IGNORE_PREFIX = "Unknown_"
+
+# Ukrainian national transliteration, plus the Russian-only letters.
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie",
+    "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l",
+    "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu",
+    "я": "ia", "ё": "e", "ы": "y", "э": "e", "ъ": "", "'": "", "’": "", "ʼ": "", "`": "",
+}
+_TRANSLIT = str.maketrans(_CYRILLIC)
+_NON_LETTERS = re.compile(r"[^a-z]+")
+# Spellings that different transliteration systems disagree on, folded to one
+# symbol. Sibilant digraphs become their own (upper-case) letters so that
+# Shevchenko and Savchenko stay two edits apart.
+_FOLDS = {
+    "shch": "S", "sch": "S", "sh": "S", "ch": "C", "zh": "Z", "kh": "h", "ts": "c", "tz": "c",
+    "ck": "k", "ph": "f", "w": "v", "x": "ks", "q": "k", "g": "h", "j": "i", "y": "i",
+}
+_FOLD = re.compile("|".join(sorted(_FOLDS, key=len, reverse=True)))
+# Common surname endings (skeleton form). When both tokens share one, only the
+# stems are compared: Savchenko / Kravchenko differ in "sav" vs "krav".
+_SUFFIXES = ("enko", "uk", "ski", "ov", "ev", "in", "iC", "ak")
+_IOTATED = re.compile(r"i(?=[aeou])")
+_REPEATS = re.compile(r"(.)\1+")
+
+
+class NameKey(NamedTuple):
+    # Transliterated tokens in sorted order: equal keys differ only by case,
+    # whitespace, token order or script.
+    norm: str
+    # Sorted phonetic skeletons of the tokens, used for blocking and scoring.
+    tokens: Tuple[str, ...]
+    skeleton: str
+
+
+class Cluster(NamedTuple):
+    canonical: str
+    # (name, similarity to canonical), canonical first
+    members: List[Tuple[str, float]]
+    # lowest member similarity to canonical
+    min_score: float
+
+
+def latin_tokens(name: str) -> List[str]:
+    text = name.lower().translate(_TRANSLIT)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in _NON_LETTERS.split(text) if t]
+
+
+@lru_cache(maxsize=1 << 16)
+def skeleton(token: str) -> str:
+    token = _FOLD.sub(lambda m: _FOLDS[m.group()], token)
+    return _IOTATED.sub("", _REPEATS.sub(r"\1", token))
+
+
+def name_key(name: str) -> NameKey:
+    latin = latin_tokens(name)
+    tokens = tuple(sorted(skeleton(t) for t in latin))
+    return NameKey(" ".join(sorted(latin)), tokens, " ".join(tokens))
+
+
+def blocking_keys(key: NameKey) -> List[Tuple[str, ...]]:
+    """
+    Bucket keys: token prefixes, token suffixes (a typo near the start of a
+    token still shares its ending) and the longest token as a whole.
+    """
+    keys: List[Tuple[str, ...]] = []
+    for kind, part in (("p", lambda t: t[:BLOCK_AFFIX]), ("s", lambda t: t[-BLOCK_AFFIX:])):
+        affixes = sorted({part(t) for t in key.tokens})
+        keys.extend((kind,) + pair for pair in combinations(affixes, 2))
+        if len(affixes) == 1:
+            keys.append((kind, affixes[0]))
+    longest = max(key.tokens, key=len, default="")
+    if len(longest) >= 5:
+        keys.append(("t", longest))
+    return keys
+
+
+def _gender_variant(x: str, y: str) -> bool:
+    # Oleksandr / Oleksandra, Ivanov / Ivanova: different people, not typos.
+    short, long_ = (x, y) if len(x) <= len(y) else (y, x)
+    return long_.startswith(short) and long_[len(short):] in ("a", "ia", "na")
+
+
+@lru_cache(maxsize=1 << 16)
+def _letter_counts(token: str) -> Tuple[int, ...]:
+    return tuple(token.count(c) for c in string.ascii_letters)
+
+
+@lru_cache(maxsize=1 << 18)
+def _token_ratio(x: str, y: str) -> float:
+    # Names reuse a small set of tokens, so most pairs are answered from the cache.
+    if x == y:
+        return 1.0
+    if _gender_variant(x, y):
+        return 0.0
+    for suffix in _SUFFIXES:
+        if x.endswith(suffix) and y.endswith(suffix) and len(x) > len(suffix) and len(y) > len(suffix):
+            x, y = x[: -len(suffix)], y[: -len(suffix)]
+            break
+    # Shared-letter count bounds the ratio from above and rejects most pairs cheaply.
+    common = sum(map(min, _letter_counts(x), _letter_counts(y)))
+    if 2.0 * common / (len(x) + len(y)) < TOKEN_FLOOR:
+        return 0.0
+    return SequenceMatcher(None, x, y, autojunk=False).ratio()
+
+
+def similarity(a: NameKey, b: NameKey, threshold: float = 0.0) -> float:
+    """
+    0..1 score of two normalized names; 0.0 as soon as it cannot reach `threshold`.
+    Case/whitespace/order/script-only differences score 1.0, transliteration-only 0.99.
+    Names with the same number of tokens are compared token by token (length
+    weighted, every token at least TOKEN_FLOOR), so a shared long surname cannot
+    carry two different first names.
+    """
+    if a.norm == b.norm:
+        return 1.0
+    la, lb = len(a.skeleton), len(b.skeleton)
+    if 2.0 * min(la, lb) / (la + lb or 1) < threshold:
+        return 0.0
+    if a.skeleton == b.skeleton:
+        return 0.99
+    if len(a.tokens) != len(b.tokens):
+        return SequenceMatcher(None, a.skeleton, b.skeleton, autojunk=False).ratio()
+
+    score = _aligned_score(a.tokens, b.tokens)
+    if not score and len(b.tokens) == 2 and any(x[0] != y[0] for x, y in zip(a.tokens, b.tokens)):
+        # A typo in a first letter can flip the sorted token order.
+        score = _aligned_score(a.tokens, b.tokens[::-1])
+    return min(score, 0.98)
+
+
+def _aligned_score(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    total = weight = 0.0
+    for x, y in zip(a, b):
+        r = _token_ratio(x, y)
+        if r < TOKEN_FLOOR:
+            return 0.0
+        total += r * (len(x) + len(y))
+        weight += len(x) + len(y)
+    return total / weight
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def find_clusters(
+    name_counts: Dict[str, Counter],
+    threshold: float = DEFAULT_THRESHOLD,
+    max_block: int = MAX_BLOCK,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[Cluster]:
+    """
+    Cluster the names of {name: Counter(category)} that look like the same athlete.
+    The most frequent spelling (first seen on ties) becomes the canonical name;
+    every member scores at least `threshold` against it.
+    """
+    names = [n for n in name_counts if n.strip() and not n.startswith(IGNORE_PREFIX)]
+    keys = [name_key(n) for n in names]
+
+    blocks: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        for bk in blocking_keys(key):
+            blocks[bk].append(i)
+
+    # Candidate pairs from every bucket, each pair once: {i: {j > i}}.
+    neighbours: Dict[int, Set[int]] = defaultdict(set)
+    skipped = 0
+    for members in blocks.values():
+        if len(members) > max_block:
+            skipped += 1
+            continue
+        for n, i in enumerate(members):
+            if n + 1 < len(members):
+                neighbours[i].update(members[n + 1:])
+
+    uf = _UnionFind(len(names))
+    compared = 0
+    for i, js in neighbours.items():
+        for j in js:
+            if uf.find(i) == uf.find(j):
+                continue
+            compared += 1
+            score = similarity(keys[i], keys[j], threshold)
+            if score >= threshold:
+                uf.union(i, j)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(names)):
+        groups[uf.find(i)].append(i)
+
+    clusters: List[Cluster] = []
+    for idxs in groups.values():
+        if len(idxs) < 2:
+            continue
+        # Most frequent spelling first; it takes every name close enough to it,
+        # the next most frequent of the rest does the same, and so on.
+        remaining = sorted(idxs, key=lambda i: (-sum(name_counts[names[i]].values()), i))
+        while len(remaining) > 1:
+            canon, rest = remaining[0], remaining[1:]
+            scores = {i: similarity(keys[canon], keys[i], threshold) for i in rest}
+            members = [(names[i], round(scores[i], 3)) for i in rest if scores[i] >= threshold]
+            remaining = [i for i in rest if scores[i] < threshold]
+            if members:
+                min_score = min(score for _, score in members)
+                clusters.append(Cluster(names[canon], [(names[canon], 1.0)] + members, min_score))
+    clusters.sort(key=lambda c: c.canonical.lower())
+
+    if stats is not None:
+        stats.update(names=len(names), blocks=len(blocks), pairs_compared=compared, blocks_skipped=skipped)
+    return clusters
+
+
+def merge_map(clusters: Iterable[Cluster]) -> Dict[str, str]:
+    """
+    {variant spelling: canonical name} for auto-merging.
+    """
+    return {name: c.canonical for c in clusters for name, _ in c.members[1:]}
+
+
+def write_merged(rows: Iterable[Row], mapping: Dict[str, str], path: str) -> int:
+    """
+    Rename variants to their canonical name, drop the (name, category) repeats
+    this creates and write the result to `path` (format from its extension).
+    Returns the number of rows written.
+    """
+    writer = RowWriter(path, "ndjson" if ".ndjson" in path else "csv", path.endswith(".gz"))
+    try:
+        writer.write_unique(writer.dedupe([(mapping.get(name, name), category) for name, category in rows]))
+    finally:
+        writer.close()
+    return writer.written
+
+
+def print_clusters(clusters: List[Cluster], name_counts: Dict[str, Counter], threshold: float) -> None:
+    print(f"\nPossible duplicates (fuzzy, threshold {threshold:.2f}):")
+    if not clusters:
+        print("None")
+        return
+
+    def cats(name: str) -> str:
+        return ", ".join(f"{cat} x{cnt}" for cat, cnt in name_counts[name].items())
+
+    for c in clusters:
+        print(f"[{c.min_score:.2f}] {c.canonical} ({cats(c.canonical)})")
+        for name, score in c.members[1:]:
+            print(f"       ~ {name} {score:.2f} ({cats(name)})")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Find (and optionally merge) fuzzy duplicate athletes in scraper output.")
+    p.add_argument("inputs", nargs="+", help="CSV / NDJSON outputs (.gz ok)")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument("--max-block", type=int, default=MAX_BLOCK)
+    p.add_argument("--merge", default=None, metavar="OUT", help="write merged, deduplicated rows here")
+    args = p.parse_args()
+
+    started = time.perf_counter()
+    rows: List[Row] = []
+    name_counts: Dict[str, Counter] = defaultdict(Counter)
+    for path in args.inputs:
+        for row in read_rows(path):
+            rows.append(row)
+            name_counts[row[0]][row[1]] += 1
+
+    stats: Dict[str, int] = {}
+    clusters = find_clusters(name_counts, args.threshold, args.max_block, stats)
+    print_clusters(clusters, name_counts, args.threshold)
+    print(
+        f"\n{len(rows)} rows, {stats['names']} names, {stats['pairs_compared']} pairs compared, "
+        f"{len(clusters)} clusters, {stats['blocks_skipped']} oversized blocks skipped "
+        f"in {time.perf_counter() - started:.2f}s",
+        file=sys.stderr,
+    )
+
+    if args.merge:
+        written = write_merged(rows, merge_map(clusters), args.merge)
+        print(f"Saved -> {args.merge} with {written} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Hedged requests against tail latency.
+
+An attempt that has not finished within a recent latency percentile of its
+endpoint gets a duplicate; whichever succeeds first is used and the other is
+cancelled.
+
+- LatencyTracker keeps a sliding window of completed attempt durations per
+  endpoint; an endpoint is not hedged until its window has MIN_SAMPLES;
+- the hedge budget works like the limiter's retry budget: every request
+  deposits `ratio` tokens and every duplicate spends one, so duplicates stay
+  around `ratio` of the traffic however slow the server gets;
+- latency is measured from when the request is actually sent (the attempt
+  calls Attempt.sent() once it holds its limiter slot), so time spent queued
+  behind the rate limit neither counts as server latency nor triggers a hedge;
+- a primary that loses to its duplicate is recorded with the time it had
+  taken so far, a lower bound of its latency; leaving it out would drop
+  exactly the slow samples, so the percentile, and with it the hedge delay,
+  would keep sinking toward the fast tail;
+- cancellation is cooperative: an attempt checks Attempt.cancelled and stops
+  (raising Cancelled) once its headers arrive or between body chunks.
+  requests cannot interrupt a GET that is still waiting for headers, so a
+  losing attempt may finish in the background; its result is dropped.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+WINDOW = 200
+MIN_SAMPLES = 20
+# Never hedge sooner than this, however fast the endpoint usually is.
+MIN_DELAY = 0.02
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Attempt:
+    __slots__ = ("sent_at", "_sent", "_cancel")
+
+    def __init__(self) -> None:
+        self.sent_at: Optional[float] = None
+        self._sent = threading.Event()
+        self._cancel = threading.Event()
+
+    def sent(self) -> None:
+        if self.sent_at is None:
+            self.sent_at = time.monotonic()
+        self._sent.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+
+class LatencyTracker:
+    def __init__(self, percentile: float, window: int = WINDOW, min_samples: int = MIN_SAMPLES) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """
+        The endpoint's current percentile, or None while there are too few samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples[endpoint])
+        if len(samples) < self.min_samples:
+            return None
+        idx = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(MIN_DELAY, samples[idx])
+
+
+class Hedger:
+    def __init__(self, percentile: float = 90.0, ratio: float = 0.1, min_hedges: int = 5, workers: int = 12) -> None:
+        self.latency = LatencyTracker(percentile)
+        self.ratio = ratio
+        self._lock = threading.Lock()
+        self._tokens = float(min_hedges)
+        self._cap = float(min_hedges) * 10
+        # Primaries and duplicates both run here, so the caller can stop waiting on either.
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        self.counts = {"requests": 0, "hedged": 0, "hedge_won": 0, "over_budget": 0}
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                self.counts["over_budget"] += 1
+                return False
+            self._tokens -= 1
+            self.counts["hedged"] += 1
+            return True
+
+    def _timed(self, endpoint: str, attempt: Callable[[Attempt], T], handle: Attempt) -> T:
+        try:
+            result = attempt(handle)
+        finally:
+            handle._sent.set()  # one that failed before sending must not block run()
+        # Attempts cut short by cancellation say nothing about the endpoint's latency.
+        if handle.sent_at is not None and not handle.cancelled:
+            self.latency.record(endpoint, time.monotonic() - handle.sent_at)
+        return result
+
+    def run(self, endpoint: str, attempt: Callable[[Attempt], T]) -> Tuple[T, str]:
+        """
+        (result, how): how is "primary" (no duplicate sent), "hedged" (sent, the
+        original still won) or "hedge" (the duplicate won). Raises the original's
+        error when every attempt fails.
+        """
+        with self._lock:
+            self.counts["requests"] += 1
+            self._tokens = min(self._cap, self._tokens + self.ratio)
+        delay = self.latency.delay(endpoint)
+        if delay is None:
+            return self._timed(endpoint, attempt, Attempt()), "primary"
+
+        handles = [Attempt()]
+        futures = [self._pool.submit(self._timed, endpoint, attempt, handles[0])]
+        handles[0]._sent.wait()
+        sent_at = handles[0].sent_at
+        remaining = delay - (time.monotonic() - sent_at) if sent_at is not None else 0.0
+        done, _ = wait(futures, timeout=max(0.0, remaining))
+        if not done and self._allow():
+            handles.append(Attempt())
+            futures.append(self._pool.submit(self._timed, endpoint, attempt, handles[1]))
+
+        pending = set(futures)
+        winner: Optional[Future] = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in futures if f in done and f.exception() is None), None)
+        if winner is None:
+            raise futures[0].exception()
+        for fut, handle in zip(futures, handles):
+            if fut is not winner:
+                handle._cancel.set()
+        if winner is not futures[0] and not futures[0].done() and sent_at is not None:
+            self.latency.record(endpoint, time.monotonic() - sent_at)
+        if len(futures) == 1:
+            return winner.result(), "primary"
+        if winner is futures[1]:
+            with self._lock:
+                self.counts["hedge_won"] += 1
+            return winner.result(), "hedge"
+        return winner.result(), "hedged"
@@ -0,0 +1,116 @@
+"""
+On-disk response cache for the scraper's JSON API calls.
+
+Bodies are stored zlib-compressed in a single SQLite file keyed by URL, together
+with the ETag / Last-Modified validators the server sent. Entries younger than
+the caller's TTL are served without touching the network; older ones are
+revalidated with a conditional GET. Total stored size is capped and the least
+recently used entries are evicted first.
+"""
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Conditional request headers for revalidating this entry.
+        """
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(accessed_at)")
+
+    def get(self, url: str, ttl: float) -> Optional[CachedResponse]:
+        """
+        Return the stored response for `url` (marking it recently used), or None.
+        `fresh` is True when it was stored or revalidated less than `ttl` seconds ago.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(
+            zlib.decompress(body), etag, last_modified, stored_at, now - stored_at < ttl
+        )
+
+    def put(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        packed = zlib.compress(body)
+        if len(packed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, etag, last_modified, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, packed, etag, last_modified, now, now, len(packed)),
+            )
+            self._evict()
+
+    def revalidated(self, url: str) -> None:
+        """
+        Mark `url` as fresh again after the server answered 304 Not Modified.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for url, size in self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            victims.append((url,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", victims)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,258 @@
+"""
+Run instrumentation for the scraper.
+
+Metrics records every logical HTTP call (endpoint, status, duration, bytes,
+retries, and whether it came from the network or the cache) plus cumulative
+per-stage timings. At the end of a run it can write a JSON report and a
+Prometheus textfile-collector export. RunProfiler wraps a run in cProfile
+(across all worker threads) and tracemalloc.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+# From 3.12 cProfile hooks sys.monitoring, which is interpreter-wide: one
+# Profile sees every thread and a second one cannot be enabled alongside it.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class RequestRecord(NamedTuple):
+    endpoint: str
+    url: str
+    status: Optional[int]
+    duration: float
+    bytes: int
+    retries: int
+    # "network", "cache" (fresh hit), "revalidated" (304), "snapshot" (--offline)
+    # or "hedge" (a hedged duplicate answered first)
+    source: str
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98]}
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.requests: List[RequestRecord] = []
+        self.stages: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Dict[str, float] = defaultdict(float)
+
+    def record_request(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.requests.append(record)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[name].append(elapsed)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = list(self.requests)
+            stages = {k: list(v) for k, v in self.stages.items()}
+            counters = dict(self.counters)
+
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        by_endpoint: Dict[str, List[RequestRecord]] = defaultdict(list)
+        for rec in requests:
+            by_endpoint[rec.endpoint].append(rec)
+        for endpoint, recs in sorted(by_endpoint.items()):
+            statuses: Dict[str, int] = defaultdict(int)
+            sources: Dict[str, int] = defaultdict(int)
+            for rec in recs:
+                statuses[str(rec.status)] += 1
+                sources[rec.source] += 1
+            endpoints[endpoint] = {
+                "calls": len(recs),
+                "errors": sum(1 for r in recs if r.status is None or r.status >= 400),
+                "retries": sum(r.retries for r in recs),
+                "bytes": sum(r.bytes for r in recs),
+                "seconds": round(sum(r.duration for r in recs), 4),
+                "latency_ms": {
+                    k: round(v * 1000, 1) for k, v in percentiles([r.duration for r in recs]).items()
+                },
+                "statuses": dict(statuses),
+                "sources": dict(sources),
+            }
+
+        return {
+            "started": self.started,
+            "wall_seconds": round(self.elapsed(), 4),
+            "endpoints": endpoints,
+            "stages": {
+                name: {"count": len(v), "seconds": round(sum(v), 4), "max_seconds": round(max(v), 4)}
+                for name, v in sorted(stages.items())
+            },
+            "counters": counters,
+        }
+
+    def write_json(self, path: str, include_requests: bool = True) -> None:
+        report = self.summary()
+        if include_requests:
+            with self._lock:
+                report["requests"] = [rec._asdict() for rec in self.requests]
+        _atomic_write(path, json.dumps(report, indent=2, ensure_ascii=False))
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Export in the node_exporter textfile-collector format (written atomically).
+        """
+        s = self.summary()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[str]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        ep = s["endpoints"]
+        metric(
+            "scraper_http_requests_total", "counter", "Logical API calls by endpoint and final status.",
+            [
+                f'scraper_http_requests_total{{endpoint="{e}",status="{st}"}} {n}'
+                for e, info in ep.items() for st, n in info["statuses"].items()
+            ],
+        )
+        durations: List[str] = []
+        for e, info in ep.items():
+            for q, p in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                durations.append(
+                    f'scraper_http_request_duration_seconds{{endpoint="{e}",quantile="{q}"}} '
+                    f"{info['latency_ms'][p] / 1000:.6f}"
+                )
+            durations.append(f'scraper_http_request_duration_seconds_sum{{endpoint="{e}"}} {info["seconds"]}')
+            durations.append(f'scraper_http_request_duration_seconds_count{{endpoint="{e}"}} {info["calls"]}')
+        metric(
+            "scraper_http_request_duration_seconds", "summary", "API call duration including retries.", durations
+        )
+        metric(
+            "scraper_http_response_bytes_total", "counter", "Response body bytes by endpoint.",
+            [f'scraper_http_response_bytes_total{{endpoint="{e}"}} {info["bytes"]}' for e, info in ep.items()],
+        )
+        metric(
+            "scraper_http_retries_total", "counter", "Retried attempts by endpoint.",
+            [f'scraper_http_retries_total{{endpoint="{e}"}} {info["retries"]}' for e, info in ep.items()],
+        )
+        metric(
+            "scraper_stage_duration_seconds_total", "counter", "Cumulative time spent per pipeline stage.",
+            [
+                f'scraper_stage_duration_seconds_total{{stage="{st}"}} {info["seconds"]}'
+                for st, info in s["stages"].items()
+            ],
+        )
+        metric(
+            "scraper_run_duration_seconds", "gauge", "Wall-clock duration of the last run.",
+            [f"scraper_run_duration_seconds {s['wall_seconds']}"],
+        )
+        metric(
+            "scraper_run_timestamp_seconds", "gauge", "Start time of the last run.",
+            [f"scraper_run_timestamp_seconds {s['started']:.0f}"],
+        )
+        for name, value in sorted(s["counters"].items()):
+            metric(f"scraper_{name}", "gauge", f"{name} in the last run.", [f"scraper_{name} {value}"])
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def print_summary(self) -> None:
+        s = self.summary()
+        print(f"\nRun took {s['wall_seconds']:.2f}s")
+        for endpoint, info in s["endpoints"].items():
+            lat = info["latency_ms"]
+            print(
+                f"  {endpoint:<9} calls={info['calls']} errors={info['errors']} retries={info['retries']} "
+                f"bytes={info['bytes']} p50={lat['p50']}ms p95={lat['p95']}ms sources={info['sources']}"
+            )
+        for stage, info in s["stages"].items():
+            print(f"  stage {stage:<9} {info['seconds']:.3f}s over {info['count']} call(s)")
+
+
+def _atomic_write(path: str, text: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class RunProfiler:
+    """
+    cProfile for the main thread and every thread started while active
+    (merged into one pstats file), plus tracemalloc peak and top allocations.
+    Before 3.12 each thread needs its own Profile; from 3.12 one covers all.
+    """
+
+    def __init__(self, out_path: str) -> None:
+        self.out_path = out_path
+        self._main = cProfile.Profile()
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _bootstrap(self, frame: Any, event: str, arg: Any) -> None:
+        # First profile event in a new thread: swap in a real profiler for it.
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:  # another profiler already owns the hooks
+            return
+        with self._lock:
+            self._threads.append(prof)
+
+    def start(self) -> None:
+        tracemalloc.start(10)
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._bootstrap)
+        self._main.enable()
+
+    def stop(self, top: int = 15) -> None:
+        self._main.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            for prof in self._threads:
+                prof.disable()
+                prof.create_stats()
+                if prof.stats:  # a thread that exited before its first call has nothing
+                    stats.add(prof)
+        stats.dump_stats(self.out_path)
+
+        buf = io.StringIO()
+        stats.stream = buf
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"\nProfile -> {self.out_path} (all threads)")
+        print(buf.getvalue())
+        print(f"tracemalloc: current={current / 1e6:.1f}MB peak={peak / 1e6:.1f}MB")
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(f"  {stat}")
@@ -0,0 +1,118 @@
+"""
+Append-only completion journal for crash-safe, resumable runs.
+
+Every finished competition appends one NDJSON line with its meta, protocol
+and the names of its athletes, flushed and fsynced before the next one, so
+a run killed at any point loses at most the comps that were in flight.
+Failures are journaled too (and retried on resume). A torn last line from
+a crash is ignored on load; the latest record per compId wins.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from models import ProtocolEntry
+
+
+class JournalEntry(NamedTuple):
+    comp_id: str
+    title: str
+    category: str
+    # YYYY-MM-DD or "" as the meta had it; None in journals written before it was kept
+    date: Optional[str]
+    # in rank order; with points and results when they were journaled
+    protocol: List[ProtocolEntry]
+    # {userId: name} for the protocol's athletes that had one
+    names: Dict[str, str]
+
+
+class Journal:
+    def __init__(self, path: str, resume: bool = False) -> None:
+        """
+        resume=False starts a new journal at `path`; resume=True loads the
+        existing one (if any) and appends to it.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: Dict[str, JournalEntry] = {}
+        self.failed: Dict[str, str] = {}
+        self.skipped_lines = 0
+        torn = False
+        if resume and os.path.exists(path):
+            torn = self._load()
+        self._f = open(path, "a" if resume else "w", encoding="utf-8")
+        if torn:
+            # Start on a fresh line, or the next record would be glued to the torn one.
+            self._f.write("\n")
+
+    def _load(self) -> bool:
+        """
+        Read the journal; True if its last line is unterminated.
+        """
+        line = ""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    comp_id = rec["compId"]
+                    error = rec.get("error")
+                    if error is None:
+                        protocol = [ProtocolEntry.from_api(e, "results" in e) for e in rec["protocol"]]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    # Torn write from a crash (or a stray line): that comp is simply fetched again.
+                    self.skipped_lines += 1
+                    continue
+                if error is not None:
+                    self.failed[comp_id] = error
+                    self._done.pop(comp_id, None)
+                    continue
+                self.failed.pop(comp_id, None)
+                self._done[comp_id] = JournalEntry(
+                    comp_id, rec.get("title", ""), rec.get("category", ""), rec.get("date"), protocol,
+                    rec.get("names", {}),
+                )
+        return bool(line) and not line.endswith("\n")
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def get(self, comp_id: str) -> Optional[JournalEntry]:
+        with self._lock:
+            return self._done.get(comp_id)
+
+    def record(
+        self,
+        comp_id: str,
+        title: str,
+        category: str,
+        date: str,
+        protocol: List[ProtocolEntry],
+        user_map: Dict[str, str],
+    ) -> None:
+        names = {e.user_id: user_map[e.user_id] for e in protocol if user_map.get(e.user_id)}
+        entry = JournalEntry(comp_id, title, category, date, protocol, names)
+        self._append(
+            {"compId": comp_id, "ts": time.time(), "title": title, "category": category, "date": date,
+             "protocol": [e.to_json() for e in protocol], "names": names}
+        )
+        with self._lock:
+            self._done[comp_id] = entry
+            self.failed.pop(comp_id, None)
+
+    def record_failure(self, comp_id: str, error: str) -> None:
+        self._append({"compId": comp_id, "ts": time.time(), "error": error})
+        with self._lock:
+            self.failed[comp_id] = error
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
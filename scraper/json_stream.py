@@ -0,0 +1,392 @@
+"""
+Streaming, selective JSON extraction for large API payloads.
+
+iter_records() walks a response body chunk by chunk, finds the record array
+(the root itself, or the first `array_keys` entry of a root object) and yields
+one small dict per array element holding only the requested fields. Skipped
+values, such as per-discipline results, are never decoded into Python
+objects; fields marked WHOLE are kept as decoded subtrees.
+
+Backends:
+  ijson  - ijson's event parser (C yajl2 backend when available);
+  python - pure-Python scanner; regexes jump over skipped values in C;
+  full   - json.loads of the whole body, then projection (reference path).
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import ijson
+except ImportError:  # optional, the pure-Python scanner is used instead
+    ijson = None
+
+# Nested {key: None | WHOLE | sub-spec}; None marks a wanted scalar leaf,
+# WHOLE a value kept as-is (arrays and objects included).
+FieldSpec = Dict[str, Any]
+WHOLE = "*"
+
+_MISSING = object()
+_WS = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(r"[^,\]}\s]+")
+# Everything up to the next bracket, stepping over whole strings (which may contain brackets).
+_SKIP = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_DECODER = json.JSONDecoder()
+
+
+def field_spec(paths: Sequence[str], whole: Sequence[str] = ()) -> FieldSpec:
+    """
+    ["userId", "user.id"] -> {"userId": None, "user": {"id": None}}
+    Paths in `whole` map to WHOLE: ([], ["results"]) -> {"results": WHOLE}
+    """
+    spec: FieldSpec = {}
+    for path, leaf in [(p, None) for p in paths] + [(p, WHOLE) for p in whole]:
+        node = spec
+        parts = path.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = leaf
+    return spec
+
+
+def default_backend() -> str:
+    return "ijson" if ijson is not None else "python"
+
+
+def iter_records(
+    chunks: Iterable[bytes],
+    array_keys: Sequence[str],
+    fields: FieldSpec,
+    backend: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    backend = backend or default_backend()
+    if backend == "ijson":
+        if ijson is None:
+            raise RuntimeError("ijson backend needs: pip install ijson")
+        return _iter_ijson(chunks, array_keys, fields)
+    if backend == "python":
+        return _iter_python(chunks, array_keys, fields)
+    if backend == "full":
+        return _iter_full(chunks, array_keys, fields)
+    raise ValueError(f"unknown JSON backend: {backend}")
+
+
+def _project(obj: Dict[str, Any], fields: FieldSpec) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key, sub in fields.items():
+        value = obj.get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        if sub == WHOLE:
+            out[key] = value
+        elif sub is None:
+            if not isinstance(value, (dict, list)):
+                out[key] = value
+        elif isinstance(value, dict):
+            out[key] = _project(value, sub)
+    return out
+
+
+def _iter_full(chunks: Iterable[bytes], array_keys: Sequence[str], fields: FieldSpec) -> Iterator[Dict[str, Any]]:
+    obj = json.loads(b"".join(chunks))
+    items: Any = []
+    if isinstance(obj, list):
+        items = obj
+    elif isinstance(obj, dict):
+        # First in document order, as the streaming backends see it.
+        for key, value in obj.items():
+            if key in array_keys and isinstance(value, list):
+                items = value
+                break
+    for item in items:
+        if isinstance(item, dict):
+            yield _project(item, fields)
+
+
+class _ChunkFile:
+    """
+    Minimal binary file object over an iterable of chunks (for ijson).
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def read(self, n: int = -1) -> bytes:
+        while n < 0 or len(self._buf) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if n < 0:
+            n = len(self._buf)
+        out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+
+def _leaf_paths(fields: FieldSpec, prefix: str = "") -> Dict[str, List[str]]:
+    paths: Dict[str, List[str]] = {}
+    for key, sub in fields.items():
+        dotted = f"{prefix}.{key}" if prefix else key
+        if sub is None or sub == WHOLE:
+            paths[dotted] = dotted.split(".")
+        else:
+            paths.update(_leaf_paths(sub, dotted))
+    return paths
+
+
+def _flatten(fields: FieldSpec, prefix: str = "") -> List[Tuple[str, Any]]:
+    out: List[Tuple[str, Any]] = []
+    for key, sub in fields.items():
+        dotted = f"{prefix}.{key}" if prefix else key
+        if isinstance(sub, dict):
+            out.extend(_flatten(sub, dotted))
+        else:
+            out.append((dotted, sub))
+    return out
+
+
+def _iter_ijson(chunks: Iterable[bytes], array_keys: Sequence[str], fields: FieldSpec) -> Iterator[Dict[str, Any]]:
+    leaves = _leaf_paths(fields)
+    wholes = {path for path, sub in _flatten(fields) if sub == WHOLE}
+    root_items = {"item"}
+    keyed_items = {f"{key}.item" for key in array_keys}
+    base: Optional[str] = None
+    record: Dict[str, Any] = {}
+    root_kind: Optional[str] = None
+    chosen: Optional[str] = None
+    # Subtree under construction for a WHOLE field: (builder, path, depth)
+    building: Optional[Tuple[Any, List[str], int]] = None
+
+    def assign(path: List[str], value: Any) -> None:
+        node = record
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+        node[path[-1]] = value
+
+    for prefix, event, value in ijson.parse(_ChunkFile(chunks), use_float=True):
+        if building is not None:
+            builder, path, depth = building
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth:
+                building = builder, path, depth
+            else:
+                assign(path, builder.value)
+                building = None
+            continue
+        if root_kind is None:
+            root_kind = event
+            continue
+        if base is None:
+            if event != "start_map":
+                continue
+            if root_kind == "start_array" and prefix in root_items:
+                base = prefix
+            elif root_kind == "start_map" and prefix in keyed_items and chosen in (None, prefix):
+                # Only the first matching array key is used, like the other backends.
+                chosen = base = prefix
+            else:
+                continue
+            record = {}
+            continue
+        if prefix == base and event == "end_map":
+            yield record
+            base = None
+            continue
+        rel = prefix[len(base) + 1:]
+        if event in ("string", "number", "boolean", "null"):
+            path = leaves.get(rel)
+            if path is not None:
+                assign(path, value)
+        elif event in ("start_map", "start_array") and rel in wholes:
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            building = builder, leaves[rel], 1
+
+
+class _Reader:
+    """
+    Pull-based text buffer over byte chunks; consumed text is dropped on refill.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("unexpected end of JSON")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def string(self) -> str:
+        while True:
+            m = _STRING.match(self.buf, self.pos)
+            if m:
+                self.pos = m.end()
+                return m.group()
+            if not self.fill():
+                raise ValueError("unterminated string")
+
+    def scalar(self) -> str:
+        while True:
+            m = _SCALAR.match(self.buf, self.pos)
+            if m and (m.end() < len(self.buf) or self.eof):
+                self.pos = m.end()
+                return m.group()
+            if not self.fill():
+                if m:
+                    self.pos = m.end()
+                    return m.group()
+                raise ValueError("unexpected end of JSON")
+
+    def skip(self) -> None:
+        c = self.peek()
+        if c == '"':
+            self.string()
+            return
+        if c not in "[{":
+            self.scalar()
+            return
+        depth = 0
+        while True:
+            self.pos = _SKIP.match(self.buf, self.pos).end()
+            if self.pos >= len(self.buf) or self.buf[self.pos] == '"':
+                # Ran out of text, possibly inside a string: read more and rescan from here.
+                if not self.fill():
+                    raise ValueError("unexpected end of JSON")
+                continue
+            ch = self.buf[self.pos]
+            self.pos += 1
+            if ch in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def leaf(self) -> Any:
+        c = self.peek()
+        if c == '"':
+            return json.loads(self.string())
+        if c in "[{":
+            self.skip()
+            return _MISSING
+        return json.loads(self.scalar())
+
+    def value(self) -> Any:
+        """
+        Decode the next value whole, arrays and objects included.
+        """
+        if self.peek() not in "[{":
+            return self.leaf()
+        while True:
+            try:
+                obj, self.pos = _DECODER.raw_decode(self.buf, self.pos)
+                return obj
+            except ValueError:
+                # Container not complete in the buffer yet.
+                if not self.fill():
+                    raise
+
+    def key(self) -> str:
+        if self.peek() != '"':
+            raise ValueError(f"expected object key at offset {self.pos}")
+        key = json.loads(self.string())
+        self.expect(":")
+        return key
+
+    def after_member(self, close: str) -> bool:
+        """
+        Consume ',' (more members follow -> True) or the closing bracket (-> False).
+        """
+        c = self.peek()
+        self.pos += 1
+        if c == close:
+            return False
+        if c != ",":
+            raise ValueError(f"expected ',' or {close!r} at offset {self.pos - 1}")
+        return True
+
+    def obj(self, fields: FieldSpec) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return out
+        while True:
+            key = self.key()
+            sub = fields.get(key, _MISSING)
+            if sub is _MISSING:
+                self.skip()
+            elif sub == WHOLE:
+                out[key] = self.value()
+            elif sub is None:
+                value = self.leaf()
+                if value is not _MISSING:
+                    out[key] = value
+            elif self.peek() == "{":
+                out[key] = self.obj(sub)
+            else:
+                self.skip()
+            if not self.after_member("}"):
+                return out
+
+
+def _iter_python(chunks: Iterable[bytes], array_keys: Sequence[str], fields: FieldSpec) -> Iterator[Dict[str, Any]]:
+    r = _Reader(chunks)
+    c = r.peek()
+    if c == "{":
+        r.pos += 1
+        if r.peek() == "}":
+            return
+        while True:
+            key = r.key()
+            if key in array_keys and r.peek() == "[":
+                break
+            r.skip()
+            if not r.after_member("}"):
+                return
+    elif c != "[":
+        return
+
+    r.expect("[")
+    if r.peek() == "]":
+        return
+    while True:
+        if r.peek() == "{":
+            yield r.obj(fields)
+        else:
+            r.skip()
+        if not r.after_member("]"):
+            return
@@ -0,0 +1,385 @@
+"""
+Monte Carlo lane-throughput simulator for planning an event from a scraped CSV.
+
+Athletes are queued the way the app's autofill does it (Full-Auto mode of
+computeAutofillQueueOrder in src/utils/autofillOrder.ts): every exit fills the
+free lanes of each lane type from that type's category priority list
+(src/config/laneRules.ts), leftover lanes fall back to the exercise's general
+lane type (src/config/laneTypesByExercise.ts), then all lanes finish. That
+placement does not depend on how long attempts take, so it is computed once
+and only durations are sampled: trials x exits x lanes log-normal draws,
+evaluated with NumPy a chunk of trials at a time.
+
+Flows:
+  heats - an exit ends when its slowest lane is done (how the app advances);
+  lanes - every lane works through its own athletes back to back.
+
+Needs `pip install numpy`.
+"""
+import argparse
+import json
+from collections import Counter, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed to run simulations
+    np = None
+
+from models import normalize_category
+from output import read_rows
+
+# Keep in sync with LANE_CATEGORY_RULES in src/config/laneRules.ts
+LANE_CATEGORY_RULES: Dict[str, Dict[str, Sequence[str]]] = {
+    "bench": {
+        "paralympic": ("w1", "n2.2", "n2", "n1.1", "w0"),
+        "kettle": ("r1", "r2", "r1/n1", "r1/n2", "r2/n1"),
+        "defaultBench": ("n1", "s1", "n0", "r0", "h2", "h1"),
+    },
+    "kettle": {
+        "bench": ("w1", "n2.2", "n2", "n1.1", "w0", "r1/n1", "r1/n2", "r2/n1"),
+        "jerk": ("n1", "r1", "r2", "s1", "n0", "r0", "h2", "h1"),
+    },
+    "airbike": {
+        "chair": ("w1", "n2.2"),
+        "twoLegs": ("n2", "w0"),
+        "oneLeg": ("n1.1",),
+        "oneHand": ("r1", "r2", "r1/n1", "r1/n2", "r2/n1"),
+        "defaultAirbike": ("n1", "s1", "n0", "r0", "h2", "h1"),
+    },
+    "rowing": {
+        "skiErg": ("w1", "n2.2", "w0"),
+        "handle": ("r1", "r2", "r1/n1", "r1/n2", "r2/n1"),
+        "chair": ("n2",),
+        "defaultRowing": ("n1.1", "n1", "s1", "n0", "r0", "h2", "h1"),
+    },
+}
+
+# Keep in sync with src/config/laneTypesByExercise.ts
+LANE_TYPES_BY_EXERCISE: Dict[str, Sequence[str]] = {
+    "bench": ("paralympic", "kettle", "defaultBench"),
+    "kettle": ("bench", "jerk"),
+    "airbike": ("chair", "twoLegs", "oneLeg", "oneHand", "defaultAirbike"),
+    "rowing": ("skiErg", "handle", "chair", "defaultRowing"),
+}
+GENERAL_LANE_TYPE_BY_EXERCISE = {
+    "bench": "defaultBench",
+    "kettle": "jerk",
+    "airbike": "defaultAirbike",
+    "rowing": "defaultRowing",
+}
+
+# computeAutofillQueueOrder gives up after this many exits.
+MAX_ROUNDS = 500
+DEFAULT_TRIALS = 10000
+DEFAULT_ATTEMPT = 60.0
+DEFAULT_SPREAD = 0.25
+DEFAULT_CHANGEOVER = 20.0
+TRIAL_CHUNK = 2000
+PERCENTILES = (50, 90, 99)
+
+
+class Lane(NamedTuple):
+    id: int
+    lane_type: str
+    locked: bool = False
+    restrict_category_change: bool = False
+
+
+class Placement(NamedTuple):
+    athlete: int  # index into the input rows
+    lane_id: Optional[int]  # None: no lane accepts the athlete's category
+    lane_type: Optional[str]
+    round: int  # 1-based exit
+
+
+class SimResult(NamedTuple):
+    flow: str
+    trials: int
+    rounds: int
+    placed: int
+    unplaced: Dict[str, int]  # category -> athletes no lane accepts
+    finish: Dict[str, float]  # mean / p50 / p90 / p99 seconds
+    wait: Dict[str, float]  # same, over every athlete of every trial
+    utilization: Dict[int, float]  # lane id -> mean busy share of the event
+
+
+def allowed_categories(exercise: str, lane_type: Optional[str]) -> Sequence[str]:
+    if not lane_type:
+        return ()
+    return LANE_CATEGORY_RULES.get(exercise, {}).get(lane_type, ())
+
+
+def auto_restrict_category_change(exercise: str, lane_type: Optional[str]) -> bool:
+    """
+    SkiErg lanes should block autofill from switching them to general rowing.
+    """
+    return exercise == "rowing" and lane_type == "skiErg"
+
+
+def parse_lanes(spec: str, exercise: str) -> List[Lane]:
+    """
+    "12" -> 12 general lanes; "paralympic=2,kettle=2,defaultBench=8" -> ids 1..12 in that order.
+    """
+    if exercise not in LANE_TYPES_BY_EXERCISE:
+        raise ValueError(f"unknown exercise: {exercise}")
+    spec = spec.strip()
+    if spec.isdigit():
+        counts = [(GENERAL_LANE_TYPE_BY_EXERCISE[exercise], int(spec))]
+    else:
+        counts = []
+        for part in spec.split(","):
+            lane_type, _, n = part.partition("=")
+            lane_type = lane_type.strip()
+            if lane_type not in LANE_TYPES_BY_EXERCISE[exercise]:
+                raise ValueError(
+                    f"lane type {lane_type!r} is not used for {exercise} "
+                    f"(one of: {', '.join(LANE_TYPES_BY_EXERCISE[exercise])})"
+                )
+            counts.append((lane_type, int(n or 1)))
+    lanes: List[Lane] = []
+    for lane_type, n in counts:
+        for _ in range(n):
+            lanes.append(Lane(len(lanes) + 1, lane_type, False, auto_restrict_category_change(exercise, lane_type)))
+    return lanes
+
+
+class _VirtualLane:
+    __slots__ = ("id", "lane_type", "locked", "restrict_category_change")
+
+    def __init__(self, lane: Lane) -> None:
+        self.id = lane.id
+        self.lane_type = lane.lane_type
+        self.locked = lane.locked
+        self.restrict_category_change = lane.restrict_category_change
+
+
+def autofill_order(categories: Sequence[str], lanes: Sequence[Lane], exercise: str) -> List[Placement]:
+    """
+    Place athletes (given in orderRank order) exit by exit, like computeAutofillQueueOrder
+    with Full-Auto fallback and lanes that start empty. Athletes whose category no lane
+    takes come last with lane_id None.
+    """
+    waiting: Dict[str, Deque[int]] = {}
+    for i, cat in enumerate(categories):
+        waiting.setdefault(cat, deque()).append(i)
+
+    def pop(cat: str) -> Optional[int]:
+        q = waiting.get(cat)
+        if not q:
+            return None
+        i = q.popleft()
+        if not q:
+            del waiting[cat]
+        return i
+
+    general = GENERAL_LANE_TYPE_BY_EXERCISE[exercise]
+    general_priority = allowed_categories(exercise, general)
+    virtual = [_VirtualLane(lane) for lane in sorted(lanes, key=lambda l: l.id)]
+    placements: List[Placement] = []
+    round_no = 1
+
+    while waiting:
+        assigned = 0
+        unfilled: List[_VirtualLane] = []
+        # ---- NOW: every unlocked lane is free at the start of an exit ----
+        free_by_type: Dict[str, List[_VirtualLane]] = {}
+        for lane in virtual:
+            if lane.lane_type and not lane.locked:
+                free_by_type.setdefault(lane.lane_type, []).append(lane)
+        for lane_type, queue in free_by_type.items():
+            priority = allowed_categories(exercise, lane_type)
+            if not priority:
+                continue
+            lane_queue = deque(queue)
+            for cat in priority:
+                while lane_queue:
+                    athlete = pop(cat)
+                    if athlete is None:
+                        break
+                    placements.append(Placement(athlete, lane_queue.popleft().id, lane_type, round_no))
+                    assigned += 1
+                if not lane_queue:
+                    break
+            unfilled.extend(lane_queue)
+
+        # ---- Fallback to the general lane type ----
+        for lane in unfilled:
+            type_would_change = lane.lane_type != general
+            if lane.restrict_category_change and type_would_change:
+                continue
+            athlete = next((a for a in map(pop, general_priority) if a is not None), None)
+            if athlete is None:
+                continue
+            # The switched type sticks for later exits (nextLaneType == laneType).
+            lane.lane_type = general
+            placements.append(Placement(athlete, lane.id, general, round_no))
+            assigned += 1
+
+        if not assigned or not waiting:
+            break
+        round_no += 1
+        if round_no > MAX_ROUNDS:
+            break
+
+    leftover = sorted(i for q in waiting.values() for i in q)
+    placements.extend(Placement(i, None, None, round_no) for i in leftover)
+    return placements
+
+
+def _percentiles(values: "np.ndarray") -> Dict[str, float]:
+    if not values.size:
+        return {"mean": 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}, "max": 0.0}
+    points = np.percentile(values, PERCENTILES)
+    out = {"mean": float(values.mean())}
+    out.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, points)})
+    out["max"] = float(values.max())
+    return out
+
+
+def simulate(
+    placements: Sequence[Placement],
+    categories: Sequence[str],
+    lanes: Sequence[Lane],
+    trials: int = DEFAULT_TRIALS,
+    attempt: float = DEFAULT_ATTEMPT,
+    spread: float = DEFAULT_SPREAD,
+    changeover: float = DEFAULT_CHANGEOVER,
+    flow: str = "heats",
+    lane_attempt: Optional[Dict[str, float]] = None,
+    seed: Optional[int] = None,
+) -> SimResult:
+    """
+    Sample attempt durations (log-normal: median `attempt` seconds, or the
+    lane type's median from `lane_attempt`; `spread` is sigma of the log) and
+    evaluate the fixed placement `trials` times. `changeover` seconds pass
+    between consecutive athletes of an exit (heats) or of a lane (lanes).
+    """
+    if np is None:
+        raise RuntimeError("lane simulation needs: pip install numpy")
+    if flow not in ("heats", "lanes"):
+        raise ValueError(f"unknown flow: {flow}")
+    lane_attempt = lane_attempt or {}
+    placed = [p for p in placements if p.lane_id is not None]
+    unplaced = Counter(categories[p.athlete] for p in placements if p.lane_id is None)
+    column = {lane.id: i for i, lane in enumerate(sorted(lanes, key=lambda l: l.id))}
+    n_lanes = len(column)
+    n_rounds = max((p.round for p in placed), default=0)
+    if not placed:
+        return SimResult(flow, trials, 0, 0, dict(unplaced), _percentiles(np.zeros(0)), _percentiles(np.zeros(0)), {})
+
+    rows = np.array([p.round - 1 for p in placed])
+    cols = np.array([column[p.lane_id] for p in placed])
+    log_median = np.log([lane_attempt.get(p.lane_type, attempt) for p in placed])
+    occupied = np.zeros((n_rounds, n_lanes), dtype=bool)
+    occupied[rows, cols] = True
+    rng = np.random.default_rng(seed)
+
+    finish = np.empty(trials)
+    waits = np.empty((trials, len(placed)), dtype=np.float32)
+    busy_share = np.zeros(n_lanes)
+    for lo in range(0, trials, TRIAL_CHUNK):
+        t = min(TRIAL_CHUNK, trials - lo)
+        durations = np.exp(log_median + spread * rng.standard_normal((t, len(placed))))
+        grid = np.zeros((t, n_rounds, n_lanes))
+        grid[:, rows, cols] = durations
+        if flow == "heats":
+            exit_time = grid.max(axis=2)
+            starts = np.cumsum(exit_time + changeover, axis=1) - (exit_time + changeover)
+            done = starts[:, -1] + exit_time[:, -1]
+            waits[lo:lo + t] = starts[:, rows]
+        else:
+            slot = grid + changeover * occupied
+            ends = np.cumsum(slot, axis=1)
+            waits[lo:lo + t] = (ends - slot)[:, rows, cols]
+            # no changeover after a lane's last athlete
+            lane_done = ends[:, -1, :] - changeover * occupied.any(axis=0)
+            done = lane_done.max(axis=1)
+        finish[lo:lo + t] = done
+        busy_share += (grid.sum(axis=1) / done[:, None]).sum(axis=0)
+
+    lane_ids = sorted(column)
+    utilization = {lane_id: float(busy_share[column[lane_id]] / trials) for lane_id in lane_ids}
+    return SimResult(
+        flow, trials, n_rounds, len(placed), dict(unplaced), _percentiles(finish), _percentiles(waits), utilization
+    )
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def print_result(result: SimResult, lanes: Sequence[Lane], athletes: int) -> None:
+    print(
+        f"{athletes} athletes on {len(lanes)} lanes -> {result.rounds} exits, "
+        f"flow={result.flow}, {result.trials} trials"
+    )
+    if result.unplaced:
+        listed = ", ".join(f"{cat or '(none)'} x{n}" for cat, n in sorted(result.unplaced.items()))
+        print(f"[WARN] {sum(result.unplaced.values())} athlete(s) fit no lane: {listed}")
+    for label, stats in (("Finish time", result.finish), ("Queue wait", result.wait)):
+        cols = "  ".join(f"{k} {format_duration(v)}" for k, v in stats.items())
+        print(f"{label:<12} {cols}")
+    print("Lane utilization")
+    types = {lane.id: lane.lane_type for lane in lanes}
+    for lane_id, share in result.utilization.items():
+        print(f"  lane {lane_id:>2} {types[lane_id]:<15} {share * 100:5.1f}%")
+
+
+def parse_lane_attempts(values: Sequence[str]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for value in values:
+        lane_type, _, seconds = value.partition("=")
+        out[lane_type.strip()] = float(seconds)
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Simulate how long an event takes on the configured lanes.")
+    p.add_argument("input", help="scraped CSV/NDJSON (name, category), in queue order")
+    p.add_argument("--exercise", choices=sorted(LANE_TYPES_BY_EXERCISE), default="bench")
+    p.add_argument("--lanes", default="12", help='"N" general lanes or "type=N,type=N" (ids in that order)')
+    p.add_argument("--trials", type=int, default=DEFAULT_TRIALS)
+    p.add_argument("--attempt", type=float, default=DEFAULT_ATTEMPT, help="median attempt length, seconds")
+    p.add_argument(
+        "--lane-attempt",
+        action="append",
+        default=[],
+        metavar="TYPE=SEC",
+        help="median attempt length on one lane type (repeatable)",
+    )
+    p.add_argument("--spread", type=float, default=DEFAULT_SPREAD, help="log-normal sigma of attempt lengths")
+    p.add_argument("--changeover", type=float, default=DEFAULT_CHANGEOVER, help="seconds between athletes")
+    p.add_argument("--flow", choices=("heats", "lanes"), default="heats")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--json", default=None, metavar="PATH", help="also write the result as JSON")
+    args = p.parse_args(argv)
+
+    try:
+        lanes = parse_lanes(args.lanes, args.exercise)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    categories = [normalize_category(category) for _, category in read_rows(args.input)]
+    placements = autofill_order(categories, lanes, args.exercise)
+    result = simulate(
+        placements,
+        categories,
+        lanes,
+        trials=args.trials,
+        attempt=args.attempt,
+        spread=args.spread,
+        changeover=args.changeover,
+        flow=args.flow,
+        lane_attempt=parse_lane_attempts(args.lane_attempt),
+        seed=args.seed,
+    )
+    print_result(result, lanes, len(categories))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result._asdict(), f, indent=2)
+        print(f"Result -> {args.json}")
+
+
+if __name__ == "__main__":
+    main()
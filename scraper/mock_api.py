@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for apitrenvet.allstrongman.com.
+
+Serves /api/competitions/{id}, /athletes, /protocol and the paged
+/api/competitions?eventId=|organizerId= listing, and /api/users/{id}
+profiles, with generated but
+deterministic data (the same compId always returns the same athletes), plus
+configurable latency, 5xx error rate and 429 throttling. Point the scraper at
+it with --api-base http://127.0.0.1:<port>/api.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+CATEGORIES = ["w1", "n2.2", "n2", "n1.1", "w0", "r1", "r2", "n1", "s1", "n0", "r0", "h2", "h1"]
+FIRST_NAMES = ["Олександр", "Андрій", "Марія", "Ivan", "Olena", "Dmytro", "Юлія", "Taras", "Оксана", "Petro"]
+LAST_NAMES = ["Коваленко", "Шевченко", "Bondarenko", "Tkachenko", "Мельник", "Kravchenko", "Бойко", "Savchenko"]
+DISCIPLINES = 4
+
+
+class MockConfig(NamedTuple):
+    athletes_min: int = 10
+    athletes_max: int = 60
+    # Pool the athletes are drawn from; smaller pool = more athletes shared between comps.
+    athlete_pool: int = 2000
+    latency_ms: float = 40.0
+    # Sigma of the log-normal latency around latency_ms (0 = fixed latency).
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    seed: int = 0
+    # Competitions listed per event for discovery (/api/competitions?eventId=...).
+    event_comps: int = 11
+    # Fraction of athletes a comp's /athletes list leaves out (their profiles still resolve).
+    missing_names: float = 0.0
+
+
+def _user_id(n: int) -> str:
+    return f"{n:024x}"
+
+
+def _comp_rng(config: MockConfig, comp_id: str) -> random.Random:
+    return random.Random(f"{config.seed}:{comp_id}")
+
+
+def competition(config: MockConfig, comp_id: str) -> Dict[str, Any]:
+    rng = _comp_rng(config, comp_id)
+    category = rng.choice(CATEGORIES)
+    return {
+        "_id": comp_id,
+        "title": f"Mock Cup {config.seed} - {category}",
+        "limitationGroup": category,
+        "date": f"2026-03-{1 + int(comp_id, 16) % 28:02d}T09:00:00.000Z",
+    }
+
+
+def listing(config: MockConfig, query: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Paged competition listing for an event (eventId) or organizer (organizerId = 3 events).
+    """
+    if "eventId" in query:
+        events = [query["eventId"][0]]
+    elif "organizerId" in query:
+        events = [f"{query['organizerId'][0]}-{n}" for n in range(3)]
+    else:
+        events = []
+    comp_ids = [
+        hashlib.md5(f"{config.seed}:{event}:{i}".encode()).hexdigest()[:24]
+        for event in events
+        for i in range(config.event_comps)
+    ]
+    page = int(query.get("page", ["1"])[0])
+    limit = int(query.get("limit", ["50"])[0])
+    chunk = comp_ids[(page - 1) * limit:page * limit]
+    return {"data": [competition(config, cid) for cid in chunk], "total": len(comp_ids)}
+
+
+def _field(config: MockConfig, comp_id: str) -> List[int]:
+    rng = _comp_rng(config, comp_id)
+    rng.choice(CATEGORIES)
+    size = rng.randint(config.athletes_min, config.athletes_max)
+    return rng.sample(range(config.athlete_pool), min(size, config.athlete_pool))
+
+
+def _athlete(n: int) -> Dict[str, Any]:
+    rng = random.Random(f"athlete:{n}")
+    return {
+        "userId": _user_id(n),
+        "name": rng.choice(FIRST_NAMES),
+        "lastName": rng.choice(LAST_NAMES),
+        "city": "Kyiv",
+        "weight": round(rng.uniform(50, 140), 1),
+    }
+
+
+def athletes(config: MockConfig, comp_id: str) -> Dict[str, Any]:
+    rng = _comp_rng(config, comp_id + ":athletes")
+    return {"data": [_athlete(n) for n in _field(config, comp_id) if rng.random() >= config.missing_names]}
+
+
+def user(config: MockConfig, user_id: str) -> Optional[Dict[str, Any]]:
+    n = int(user_id, 16)
+    if n >= config.athlete_pool:
+        return None
+    a = _athlete(n)
+    return {"_id": a.pop("userId"), **a}
+
+
+def protocol(config: MockConfig, comp_id: str) -> Dict[str, Any]:
+    field = _field(config, comp_id)
+    rng = _comp_rng(config, comp_id + ":protocol")
+    entries = []
+    for rank, n in enumerate(field, start=1):
+        entries.append(
+            {
+                "userId": _user_id(n),
+                "rank": rank,
+                "points": round(100 - rank * 1.5, 1),
+                "results": [
+                    {"discipline": d, "result": round(rng.uniform(5, 60), 2), "points": rng.randint(1, 20)}
+                    for d in range(DISCIPLINES)
+                ],
+            }
+        )
+    return {"protocol": entries}
+
+
+def route(config: MockConfig, path: str, query: Dict[str, List[str]]) -> Optional[Any]:
+    if path.rstrip("/") == "/api/competitions":
+        return listing(config, query)
+    m = re.fullmatch(r"/api/users/([a-f0-9]+)/?", path)
+    if m:
+        return user(config, m.group(1))
+    m = re.fullmatch(r"/api/competitions/([a-f0-9]+)(/athletes|/protocol)?/?", path)
+    if not m:
+        return None
+    comp_id, suffix = m.group(1), m.group(2)
+    if suffix == "/athletes":
+        return athletes(config, comp_id)
+    if suffix == "/protocol":
+        return protocol(config, comp_id)
+    return competition(config, comp_id)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    config = MockConfig()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        config = self.config
+        delay = config.latency_ms
+        if config.latency_sigma:
+            delay *= math.exp(random.gauss(0, config.latency_sigma))
+        time.sleep(delay / 1000.0)
+
+        roll = random.random()
+        if roll < config.throttle_rate:
+            self._send(429, b'{"message":"Too Many Requests"}', {"Retry-After": str(config.retry_after)})
+            return
+        if roll < config.throttle_rate + config.error_rate:
+            self._send(500, b'{"message":"Internal Server Error"}')
+            return
+
+        url = urlsplit(self.path)
+        obj = route(config, url.path, parse_qs(url.query))
+        if obj is None:
+            self._send(404, b'{"message":"Not Found"}')
+            return
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return
+        self._send(200, body, {"Content-Type": "application/json; charset=utf-8", "ETag": etag})
+
+
+def make_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_thread(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start a mock server on a background thread. Returns (server, api_base).
+    """
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, name="mock-api", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api"
+
+
+def add_config_args(p: argparse.ArgumentParser) -> None:
+    d = MockConfig()
+    p.add_argument("--athletes-min", type=int, default=d.athletes_min)
+    p.add_argument("--athletes-max", type=int, default=d.athletes_max)
+    p.add_argument("--athlete-pool", type=int, default=d.athlete_pool)
+    p.add_argument("--latency-ms", type=float, default=d.latency_ms, help="median response latency")
+    p.add_argument("--latency-sigma", type=float, default=d.latency_sigma, help="log-normal spread, 0 = fixed")
+    p.add_argument("--error-rate", type=float, default=d.error_rate, help="fraction of 500 responses")
+    p.add_argument("--throttle-rate", type=float, default=d.throttle_rate, help="fraction of 429 responses")
+    p.add_argument("--retry-after", type=int, default=d.retry_after, help="Retry-After seconds on 429")
+    p.add_argument("--seed", type=int, default=d.seed)
+    p.add_argument("--event-comps", type=int, default=d.event_comps, help="competitions per listed event")
+    p.add_argument(
+        "--missing-names", type=float, default=d.missing_names, help="fraction of athletes left out of /athletes"
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(**{k: getattr(args, k) for k in MockConfig._fields})
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Serve a fake allstrongman API for local testing.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    add_config_args(p)
+    args = p.parse_args()
+    server = make_server(config_from_args(args), args.host, args.port)
+    print(f"Mock API on http://{args.host}:{server.server_address[1]}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Typed records for competitions, athletes and protocol entries.
+
+The API spells the same field several ways (name / firstName, userId /
+user_id / id / user.id, limitationGroup / category, ...). from_api() settles
+that once, when a record is parsed, so every later stage reads attributes.
+Records are NamedTuples (no per-instance __dict__), and userIds and
+categories are interned: an athlete seen in forty competitions shares one
+userId string, and a season's protocols share a dozen category strings.
+"""
+import re
+from sys import intern
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Per-record constructors skip the generated NamedTuple __new__ (about half the
+# cost of parsing an entry); fields must then be passed in declaration order.
+_tuple_new = tuple.__new__
+
+
+def competition_title_only(title: str) -> str:
+    return title.split(" - ")[0].strip() if " - " in title else (title or "").strip()
+
+
+def normalize_category(raw: Optional[str]) -> str:
+    """
+    Category as the web app stores it: whitespace removed, lower case.
+    """
+    if not raw:
+        return ""
+    return re.sub(r"\s+", "", raw.strip()).lower()
+
+
+def athlete_name(a: Dict[str, Any]) -> str:
+    """
+    "First Last" from whichever name fields the record has ("" if none).
+    """
+    first = str(a.get("name") or a.get("firstName") or "").strip()
+    last = str(a.get("lastName") or a.get("surname") or "").strip()
+    full = (first + " " + last).strip()
+    if not full:
+        full = str(a.get("fullName") or a.get("displayName") or "").strip()
+    return full
+
+
+class Competition(NamedTuple):
+    comp_id: str
+    # title before " - <category>"
+    title: str
+    category: str
+    # YYYY-MM-DD, or "" when the API has no date
+    date: str
+
+    @classmethod
+    def from_api(cls, comp_id: str, obj: Any) -> "Competition":
+        if isinstance(obj, list):
+            obj = obj[0] if obj else {}
+        category = str(
+            obj.get("limitationGroup") or obj.get("limitation_group") or obj.get("category") or obj.get("group") or ""
+        ).strip()
+        if category == "Empty":
+            category = "h1"
+        date = str(obj.get("date") or obj.get("startDate") or obj.get("dateStart") or "")[:10]
+        return cls(comp_id, competition_title_only(str(obj.get("title", "")).strip()), intern(category), date)
+
+
+class Athlete(NamedTuple):
+    user_id: str
+    name: str
+
+    @classmethod
+    def from_api(cls, a: Dict[str, Any]) -> Optional["Athlete"]:
+        """
+        None when the record has no userId or no name.
+        """
+        uid = a.get("userId") or a.get("user_id") or a.get("id") or (a.get("user") or {}).get("id")
+        name = athlete_name(a)
+        if not uid or not name:
+            return None
+        return _tuple_new(cls, (intern(str(uid)), name))
+
+
+class ProtocolEntry(NamedTuple):
+    user_id: str
+    rank: int
+    # Only kept with the results store: total points and per-discipline results.
+    points: Any = None
+    results: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_api(cls, entry: Dict[str, Any], full: bool = False) -> Optional["ProtocolEntry"]:
+        """
+        None for entries without userId or rank. Journal records parse the same way.
+        """
+        user_id = entry.get("userId")
+        rank = entry.get("rank")
+        if user_id is None or rank is None:
+            return None
+        if not full:
+            return _tuple_new(cls, (intern(str(user_id)), int(rank), None, None))
+        results = entry.get("results")
+        results = [r for r in results if isinstance(r, dict)] if isinstance(results, list) else []
+        return _tuple_new(cls, (intern(str(user_id)), int(rank), entry.get("points"), results))
+
+    def to_json(self) -> Dict[str, Any]:
+        obj: Dict[str, Any] = {"userId": self.user_id, "rank": self.rank}
+        if self.results is not None:
+            obj["points"] = self.points
+            obj["results"] = self.results
+        return obj
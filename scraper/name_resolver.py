@@ -0,0 +1,114 @@
+"""
+Run-wide resolution of athlete names that a comp's athlete list lacked.
+
+A protocol userId without a name becomes a PendingName row: it reads as the
+Unknown_<tail> placeholder, but keeps the userId, so the real name is filled
+in by id (fill_names) before the row is written. The resolver remembers
+those ids, along with every name any athlete list of the run did provide.
+After the last comp each missing id is looked up: among those names, then in
+the local athlete store (one batched query), then through the per-user
+profile endpoint on a bounded pool. Store / profile lookups happen once per
+id for the resolver's lifetime, misses included, so a long-lived resolver
+(serve mode) does not ask the API again for names it could not find.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models import ProtocolEntry
+
+Row = Tuple[str, str]
+
+
+def placeholder_name(user_id: str) -> str:
+    tail = user_id[-6:] if len(user_id) >= 6 else user_id
+    return f"Unknown_{tail}"
+
+
+class PendingName(str):
+    """
+    The placeholder name of an athlete whose name is not known yet.
+    """
+
+    def __new__(cls, user_id: str) -> "PendingName":
+        obj = super().__new__(cls, placeholder_name(user_id))
+        obj.user_id = user_id
+        return obj
+
+    def __getnewargs__(self) -> Tuple[str]:
+        return (self.user_id,)
+
+
+def has_pending(rows: Iterable[Row]) -> bool:
+    return any(isinstance(name, PendingName) for name, _ in rows)
+
+
+def fill_names(rows: Iterable[Row], names: Dict[str, str]) -> List[Row]:
+    """
+    Rows with every PendingName that `names` ({userId: name}) knows replaced.
+    """
+    return [
+        (names.get(name.user_id, name) if isinstance(name, PendingName) else name, category)
+        for name, category in rows
+    ]
+
+
+class NameResolver:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # One resolve() at a time, so concurrent callers never look up the same id twice.
+        self._resolving = threading.Lock()
+        # userId -> name from every athlete list seen this run
+        self._seen: Dict[str, str] = {}
+        # ids already looked up in the store / profiles, and the names that turned up
+        self._looked_up: Set[str] = set()
+        self._found: Dict[str, str] = {}
+        self.missing: Set[str] = set()
+        self.sources: Dict[str, int] = {"run": 0, "store": 0, "profile": 0}
+
+    def note_names(self, user_map: Dict[str, str]) -> None:
+        with self._lock:
+            self._seen.update(user_map)
+
+    def note_missing(self, protocol: Iterable[ProtocolEntry], user_map: Dict[str, str]) -> None:
+        ids = [e.user_id for e in protocol if not user_map.get(e.user_id)]
+        if ids:
+            with self._lock:
+                self.missing.update(ids)
+
+    def resolve(
+        self,
+        lookup_local: Optional[Callable[[List[str]], Dict[str, str]]],
+        fetch_profile: Optional[Callable[[str], Optional[str]]],
+        workers: int,
+    ) -> Dict[str, str]:
+        """
+        {userId: name} for every missing id some source knows. `sources`
+        counts where this call's names came from; earlier lookups count as "run".
+        """
+        with self._resolving:
+            with self._lock:
+                pending = sorted(self.missing)
+                resolved = {uid: self._seen[uid] for uid in pending if self._seen.get(uid)}
+            for uid in pending:
+                if uid not in resolved and uid in self._found:
+                    resolved[uid] = self._found[uid]
+            self.sources = {"run": len(resolved), "store": 0, "profile": 0}
+            pending = [uid for uid in pending if uid not in resolved and uid not in self._looked_up]
+            self._looked_up.update(pending)
+
+            if pending and lookup_local is not None:
+                found = {uid: name for uid, name in lookup_local(pending).items() if name}
+                resolved.update(found)
+                self._found.update(found)
+                self.sources["store"] = len(found)
+                pending = [uid for uid in pending if uid not in found]
+
+            if pending and fetch_profile is not None:
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as ex:
+                    names = list(ex.map(fetch_profile, pending))
+                found = {uid: name for uid, name in zip(pending, names) if name}
+                resolved.update(found)
+                self._found.update(found)
+                self.sources["profile"] = len(found)
+            return resolved
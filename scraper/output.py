@@ -0,0 +1,100 @@
+"""
+Streaming output stage: per-competition rows are released in URL order as soon
+as every earlier competition has finished, deduplicated on the fly and flushed
+to disk, so the run never holds the whole event in memory.
+"""
+import csv
+import gzip
+import json
+from collections import Counter, defaultdict
+from typing import Callable, Dict, IO, Iterator, List, Set, Tuple
+
+Row = Tuple[str, str]
+
+
+class ReorderBuffer:
+    """
+    Accepts results for indexes 0..n-1 in any order and releases them in index order.
+    """
+
+    def __init__(self, release: Callable[[int, List[Row]], None]) -> None:
+        self._release = release
+        self._pending: Dict[int, List[Row]] = {}
+        self._next = 0
+
+    def put(self, idx: int, rows: List[Row]) -> None:
+        self._pending[idx] = rows
+        while self._next in self._pending:
+            self._release(self._next, self._pending.pop(self._next))
+            self._next += 1
+
+    @property
+    def waiting(self) -> int:
+        return len(self._pending)
+
+
+def open_output(path: str, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def read_rows(path: str) -> Iterator[Row]:
+    """
+    Read back (name, category) rows from a CSV or NDJSON output, gzipped or not.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        if ".ndjson" in path:
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    yield obj["name"], obj["category"]
+            return
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for rec in reader:
+            if len(rec) >= 2:
+                yield rec[0], rec[1]
+
+
+class RowWriter:
+    """
+    Writes unique (name, category) rows as CSV (same bytes as write_csv) or NDJSON,
+    keeping per-name category counts for the duplicate report.
+    """
+
+    def __init__(self, path: str, fmt: str = "csv", compress: bool = False) -> None:
+        self.fmt = fmt
+        self.received = 0
+        self.written = 0
+        self.name_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._seen: Set[Row] = set()
+        self._f = open_output(path, compress)
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._f)
+            self._csv.writerow(["name", "category"])
+
+    def dedupe(self, rows: List[Row]) -> List[Row]:
+        unique: List[Row] = []
+        for row in rows:
+            self.received += 1
+            self.name_counts[row[0]][row[1]] += 1
+            if row in self._seen:
+                continue
+            self._seen.add(row)
+            unique.append(row)
+        return unique
+
+    def write_unique(self, rows: List[Row]) -> None:
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self._f.write(json.dumps({"name": row[0], "category": row[1]}, ensure_ascii=False) + "\n")
+        self.written += len(rows)
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
@@ -0,0 +1,90 @@
+"""
+Deterministic k-way merge of per-competition protocol lists.
+
+Every competition's rows are already in rank order. merge_ranked() combines
+the k lists through a heap keyed on (policy key, stream index, position),
+so each row is pushed and popped once: O(n log k), no re-sort of the whole
+event, rows are yielded one at a time, and the result depends only on the
+inputs and their URL order, never on which request finished first.
+
+Policies:
+  concat      - competition by competition in URL order;
+  interleave  - every comp's first athlete (in URL order), then every
+                comp's second, ...;
+  round-robin - categories (in order of first appearance) take turns, each
+                emitting its weight's worth of athletes per turn (default 1);
+                comps of one category follow each other in URL order.
+"""
+import argparse
+import heapq
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Row = Tuple[str, str]
+
+POLICIES = ("concat", "interleave", "round-robin")
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, int]:
+    """
+    "n1=2,h1=1" -> {"n1": 2, "h1": 1}; a category without "=N" gets 1.
+    Raises argparse.ArgumentTypeError, so it can be an argparse `type`.
+    """
+    weights: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        category, sep, weight = (s.strip() for s in part.partition("="))
+        if not category:
+            raise argparse.ArgumentTypeError(f"missing category in {part.strip()!r}")
+        if not sep:
+            weights[category] = 1
+            continue
+        if not weight.isdigit() or int(weight) < 1:
+            raise argparse.ArgumentTypeError(f"weight of {category!r} must be a positive integer, got {weight!r}")
+        weights[category] = int(weight)
+    return weights
+
+
+def kway(streams: Sequence[Iterable[Row]], key: Callable[[int, int], Tuple[int, ...]]) -> Iterator[Row]:
+    """
+    Merge the streams by key(stream, position); ties go to the lower stream index.
+    """
+    iters = [iter(s) for s in streams]
+    heap: List[Tuple[Tuple[int, ...], int, int, Row]] = []
+    for s, it in enumerate(iters):
+        row = next(it, None)
+        if row is not None:
+            heap.append((key(s, 0), s, 0, row))
+    heapq.heapify(heap)
+    while heap:
+        _, s, pos, row = heap[0]
+        yield row
+        nxt = next(iters[s], None)
+        if nxt is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (key(s, pos + 1), s, pos + 1, nxt))
+
+
+def merge_ranked(
+    comps: Sequence[List[Row]], policy: str = "concat", weights: Optional[Dict[str, int]] = None
+) -> Iterator[Row]:
+    """
+    `comps` holds each competition's rows (rank order) in URL order.
+    """
+    if policy == "concat":
+        return kway(comps, lambda s, pos: (s, pos))
+    if policy == "interleave":
+        return kway(comps, lambda s, pos: (pos, s))
+    if policy == "round-robin":
+        by_category: Dict[str, List[List[Row]]] = {}
+        for rows in comps:
+            if rows:
+                by_category.setdefault(rows[0][1], []).append(rows)
+        categories = list(by_category)
+        weight = [(weights or {}).get(c, 1) for c in categories]
+        streams = [chain.from_iterable(by_category[c]) for c in categories]
+        # Turn number first; within a turn, categories in order of first appearance.
+        return kway(streams, lambda s, pos: (pos // weight[s], s))
+    raise ValueError(f"unknown merge policy: {policy}")
@@ -0,0 +1,166 @@
+"""
+Adaptive client-side rate limiting shared by every scraper worker.
+
+- a token bucket caps the request rate;
+- an AIMD concurrency limit grows by one slot per "window" of healthy responses
+  and halves on 429 / 5xx / transport errors or when latency degrades;
+- Retry-After pauses every worker, not only the one that got throttled;
+- retries use exponential backoff with full jitter and draw from a global
+  budget, so a struggling server is not hit with a retry storm.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        rate: float = 30.0,
+        burst: float = 30.0,
+        initial: int = 6,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        latency_tolerance: float = 2.5,
+        retry_ratio: float = 0.1,
+        min_retries: int = 10,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 20.0,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_ratio = retry_ratio
+
+        self._cond = threading.Condition()
+        self._limit = float(max(min_concurrency, min(initial, max_concurrency)))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        # Fastest smoothed latency seen so far; "healthy" is judged relative to it.
+        self._baseline: Optional[float] = None
+        self._ewma: Optional[float] = None
+        # Retry budget: every request deposits retry_ratio tokens, every retry spends one.
+        self._retry_tokens = float(min_retries)
+        self._retry_cap = float(min_retries) * 10
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold one concurrency slot (and one rate token) for the duration of a request.
+        """
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight >= int(self._limit):
+                    self._cond.wait()
+                else:
+                    break
+            self._in_flight += 1
+            self._retry_tokens = min(self._retry_cap, self._retry_tokens + self.retry_ratio)
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None) -> None:
+        """
+        Feed back one response: `status` None means a transport error / timeout.
+        """
+        overloaded = status is None or status == 429 or status >= 500
+        with self._cond:
+            now = time.monotonic()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if overloaded:
+                self._decrease(now)
+            elif status < 400:
+                self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+                if self._baseline is None or self._ewma < self._baseline:
+                    self._baseline = self._ewma
+                if self._ewma > self._baseline * self.latency_tolerance:
+                    self._decrease(now)
+                else:
+                    # +1 slot per full window of healthy responses
+                    self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def _decrease(self, now: float) -> None:
+        # At most one multiplicative decrease per smoothed RTT, so a burst of
+        # failures from the same window counts once.
+        if now - self._last_decrease < (self._ewma or 0.5):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_concurrency), self._limit / 2)
+        if self._baseline is not None and self._ewma is not None:
+            # Let the baseline drift up so a permanently slower server is not "unhealthy" forever.
+            self._baseline = (self._baseline + self._ewma) / 2
+
+    def allow_retry(self) -> bool:
+        with self._cond:
+            if self._retry_tokens < 1:
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number `attempt` (1-based): full-jitter exponential,
+        never shorter than the server's Retry-After.
+        """
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
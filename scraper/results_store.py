@@ -0,0 +1,249 @@
+"""
+Columnar store of full protocol results for season-wide analytics.
+
+One row per athlete per discipline (an athlete without results gets a single
+row with a null discipline), written as Parquet under a Hive-style layout:
+
+  <root>/event=<event>/category=<category>/part-<run>.parquet
+
+Each run stages its files under <root>/.staging-<run>/ (ignored by readers)
+and moves them into place when the event is committed, so the store is only
+ever appended to and a crashed run leaves no partial partitions behind.
+Partition values are percent-encoded ("r1/n2" -> "r1%2Fn2").
+
+Needs `pip install pyarrow`.
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for --results-store
+    pa = None
+
+from models import ProtocolEntry
+
+# Rows buffered per category before they are written out as a row group.
+ROW_GROUP_ROWS = 64 * 1024
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+COLUMNS = (
+    "comp_id", "title", "user_id", "name", "rank", "points",
+    "discipline", "result", "result_text", "discipline_points", "scraped_at",
+)
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("results store needs: pip install pyarrow")
+
+
+def schema() -> "pa.Schema":
+    _require_pyarrow()
+    return pa.schema(
+        [
+            ("comp_id", pa.string()),
+            ("title", pa.string()),
+            ("user_id", pa.string()),
+            ("name", pa.string()),
+            ("rank", pa.int32()),
+            ("points", pa.float64()),
+            ("discipline", pa.int32()),
+            # numeric result when the API gives one; result_text keeps it verbatim (times, "DNF", ...)
+            ("result", pa.float64()),
+            ("result_text", pa.string()),
+            ("discipline_points", pa.float64()),
+            ("scraped_at", pa.timestamp("ms", tz="UTC")),
+        ]
+    )
+
+
+def partitioning() -> "ds.Partitioning":
+    _require_pyarrow()
+    return ds.partitioning(pa.schema([("event", pa.string()), ("category", pa.string())]), flavor="hive")
+
+
+def partition_dir(key: str, value: str) -> str:
+    return f"{key}={quote(value, safe='') if value else NULL_PARTITION}"
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _discipline(result: Dict[str, Any], position: int) -> int:
+    try:
+        return int(result.get("discipline"))
+    except (TypeError, ValueError):
+        return position
+
+
+def result_rows(
+    comp_id: str,
+    title: str,
+    protocol: List[ProtocolEntry],
+    names: Dict[str, str],
+    scraped_at: float,
+) -> Dict[str, List[Any]]:
+    """
+    Flatten protocol entries (one row per discipline result) into columns.
+    """
+    cols: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+    stamp = int(scraped_at * 1000)
+    for entry in protocol:
+        for position, res in enumerate(entry.results or [None]):
+            cols["comp_id"].append(comp_id)
+            cols["title"].append(title)
+            cols["user_id"].append(entry.user_id)
+            cols["name"].append(names.get(entry.user_id))
+            cols["rank"].append(entry.rank)
+            cols["points"].append(_number(entry.points))
+            cols["scraped_at"].append(stamp)
+            if res is None:
+                for c in ("discipline", "result", "result_text", "discipline_points"):
+                    cols[c].append(None)
+                continue
+            raw = res.get("result")
+            cols["discipline"].append(_discipline(res, position))
+            cols["result"].append(_number(raw))
+            cols["result_text"].append(None if raw is None else str(raw))
+            cols["discipline_points"].append(_number(res.get("points")))
+    return cols
+
+
+class ResultsStore:
+    def __init__(self, root: str) -> None:
+        _require_pyarrow()
+        self.root = root
+        self.run_id = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self.staging = os.path.join(root, f".staging-{self.run_id}")
+        self.rows = 0
+        self.comps = 0
+        self._schema = schema()
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, Dict[str, List[Any]]] = {}
+        self._writers: Dict[str, "pq.ParquetWriter"] = {}
+
+    def add(
+        self,
+        comp_id: str,
+        title: str,
+        category: str,
+        protocol: List[ProtocolEntry],
+        names: Dict[str, str],
+        scraped_at: Optional[float] = None,
+    ) -> int:
+        cols = result_rows(comp_id, title, protocol, names, time.time() if scraped_at is None else scraped_at)
+        n = len(cols["comp_id"])
+        with self._lock:
+            buf = self._buffers.setdefault(category, {c: [] for c in COLUMNS})
+            for c in COLUMNS:
+                buf[c].extend(cols[c])
+            self.rows += n
+            self.comps += 1
+            if len(buf["comp_id"]) >= ROW_GROUP_ROWS:
+                self._flush(category)
+        return n
+
+    def _flush(self, category: str) -> None:
+        buf = self._buffers.pop(category, None)
+        if not buf or not buf["comp_id"]:
+            return
+        writer = self._writers.get(category)
+        if writer is None:
+            path = os.path.join(self.staging, partition_dir("category", category), "part.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writer = self._writers[category] = pq.ParquetWriter(path, self._schema, compression="zstd")
+        writer.write_table(pa.table(buf, schema=self._schema), row_group_size=ROW_GROUP_ROWS)
+
+    def commit(self, event: str) -> List[str]:
+        """
+        Write what is buffered and move this run's files under event=<event>.
+        Returns the new part files.
+        """
+        with self._lock:
+            for category in list(self._buffers):
+                self._flush(category)
+            for writer in self._writers.values():
+                writer.close()
+            parts = []
+            event_dir = os.path.join(self.root, partition_dir("event", event))
+            for category in self._writers:
+                staged_dir = os.path.join(self.staging, partition_dir("category", category))
+                final_dir = os.path.join(event_dir, partition_dir("category", category))
+                os.makedirs(final_dir, exist_ok=True)
+                final = os.path.join(final_dir, f"part-{self.run_id}.parquet")
+                os.replace(os.path.join(staged_dir, "part.parquet"), final)
+                parts.append(final)
+            self._writers.clear()
+        shutil.rmtree(self.staging, ignore_errors=True)
+        return parts
+
+    def discard(self) -> None:
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+            self._buffers.clear()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+def load(
+    root: str,
+    events: Sequence[str] = (),
+    categories: Sequence[str] = (),
+    columns: Optional[Sequence[str]] = None,
+) -> "pa.Table":
+    """
+    Read the store (optionally only some events / categories) into one Arrow table.
+    Partition pruning means unselected partitions are never opened.
+    """
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning())
+    flt = None
+    if events:
+        flt = ds.field("event").isin(list(events))
+    if categories:
+        cat = ds.field("category").isin(list(categories))
+        flt = cat if flt is None else flt & cat
+    return dataset.to_table(columns=list(columns) if columns else None, filter=flt)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Summarize a protocol results store.")
+    p.add_argument("root", help="store directory (--results-store of scraper.py)")
+    p.add_argument("--event", action="append", default=[], help="only this event (repeatable)")
+    p.add_argument("--category", action="append", default=[], help="only this category (repeatable)")
+    args = p.parse_args(argv)
+    _require_pyarrow()
+
+    started = time.perf_counter()
+    table = load(args.root, args.event, args.category)
+    elapsed = time.perf_counter() - started
+    print(f"{table.num_rows} rows loaded in {elapsed * 1000:.1f} ms")
+    if not table.num_rows:
+        return
+    grouped = table.group_by(["event", "category"]).aggregate(
+        [("comp_id", "count_distinct"), ("user_id", "count_distinct"), ("comp_id", "count")]
+    )
+    for row in sorted(grouped.to_pylist(), key=lambda r: (r["event"], r["category"] or "")):
+        print(
+            f"  {row['event']} / {row['category']}: {row['comp_id_count_distinct']} comp(s), "
+            f"{row['user_id_count_distinct']} athletes, {row['comp_id_count']} rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
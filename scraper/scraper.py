@@ -1,15 +1,45 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
 import csv
+import json
+import os
+import queue
 import re
+import sys
+import threading
 import time
-from typing import List, Tuple, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Iterator, Callable, ContextManager, Set
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from collections import Counter, defaultdict
+from itertools import islice
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestsDependencyWarning
 import warnings
 
+from athlete_store import AthleteStore
+from discovery import DiscoveryFilter, discover
+from firestore_sink import FirestoreSink, project_from_dotenv
+from fuzzy_dupes import DEFAULT_THRESHOLD, find_clusters, merge_map, print_clusters, write_merged
+from hedging import Attempt, Cancelled, Hedger
+from http_cache import ResponseCache
+from json_stream import FieldSpec, field_spec, iter_records
+from instrumentation import Metrics, RequestRecord, RunProfiler
+from journal import Journal
+from models import Athlete, Competition, ProtocolEntry, athlete_name
+from name_resolver import NameResolver, PendingName, fill_names, has_pending
+from output import ReorderBuffer, RowWriter, read_rows
+from rank_merge import POLICIES, merge_ranked, parse_weights
+from rate_limit import AdaptiveLimiter, parse_retry_after
+from results_store import ResultsStore
+from service import CompSnapshot, ScraperService, make_server
+from snapshot import SnapshotReader, SnapshotWriter
+from warehouse import Warehouse
+from watch import DeltaWriter, ProtocolWatcher
+
 warnings.simplefilter("ignore", RequestsDependencyWarning)
 
 
@@ -27,9 +57,94 @@ URLS = [
     'https://trenvet.allstrongman.com/comp-page;compId=6920b51642cf6b1953dffa81'
 ]
 
+COMP_PAGE_URL = "https://trenvet.allstrongman.com/comp-page;compId={}"
+# Discovery listing endpoints, relative to API_BASE; {id} is the event / organizer id.
+DISCOVERY_LISTINGS = {
+    "event": "/competitions?eventId={id}",
+    "organizer": "/competitions?organizerId={id}",
+}
+DISCOVERY_PAGE_SIZE = 50
+
 MAX_WORKERS = 6
+# Global cap on in-flight API calls for the asyncio engine (all comps share it).
+ASYNC_CONCURRENCY = 18
 API_BASE = "https://apitrenvet.allstrongman.com/api"
 
+CACHE_DIR = ".scraper_cache"
+CACHE_MAX_MB = 256
+# Seconds a cached body is served without asking the server; after that it is revalidated.
+CACHE_TTLS = {
+    "meta": 6 * 3600,
+    "athletes": 600,
+    "protocol": 0,
+    "listing": 300,
+    "profile": 6 * 3600,
+    "other": 60,
+}
+
+HTTP_RETRIES = 3
+# --hedge: duplicate an attempt slower than this percentile of its endpoint's recent
+# latencies; duplicates are capped at about HEDGE_BUDGET of all requests.
+HEDGE_PERCENTILE = 90.0
+HEDGE_BUDGET = 0.1
+# Adaptive limiter defaults: request rate ceiling (0 = no cap, opt in with --rate)
+# and concurrency ceiling.
+RATE_LIMIT = 0.0
+MAX_CONCURRENCY = 32
+
+JOURNAL_FILE = ".scrape-journal.ndjson"
+
+# Per-user profile endpoint (e.g. "/users/{id}") asked for names no athlete list of
+# the run provided. The public API does not document one, so it is opt-in.
+PROFILE_PATH = ""
+# A missing profile is not worth the full retry budget.
+PROFILE_RETRIES = 2
+
+# --serve: seconds a cached protocol is served before it is refreshed in the background.
+SERVE_TTL = 10.0
+
+WATCH_INTERVAL = 15.0
+WATCH_JITTER = 0.2
+
+# Rows handed to the writer at a time when a merge policy other than concat is used.
+MERGE_CHUNK = 1000
+
+# Protocol / athlete bodies are parsed into only these fields; large bodies as they stream in.
+READ_CHUNK = 64 * 1024
+# --json-backend auto: json.loads unless the body is larger than this.
+STREAM_MIN_BYTES = 1024 * 1024
+# What an attempt returns instead of data when the server answered 304.
+NOT_MODIFIED = object()
+PROTOCOL_FIELDS = field_spec(["userId", "rank"])
+# With --results-store the points and per-discipline results are kept too.
+PROTOCOL_RESULT_FIELDS = field_spec(["userId", "rank", "points"], whole=["results"])
+ATHLETE_FIELDS = field_spec(
+    ["name", "firstName", "lastName", "surname", "fullName", "displayName", "userId", "user_id", "id", "user.id"]
+)
+# json_stream backend: None is "full", or for a streamable body ijson when installed,
+# else the pure-Python scanner.
+JSON_BACKEND: Optional[str] = None
+
+# Set by main() unless --no-cache / --no-athlete-db / --no-adaptive is given.
+RESPONSE_CACHE: Optional[ResponseCache] = None
+ATHLETE_STORE: Optional[AthleteStore] = None
+LIMITER: Optional[AdaptiveLimiter] = None
+# Set by main() with --hedge.
+HEDGER: Optional[Hedger] = None
+METRICS: Optional[Metrics] = None
+# Completion journal of the event being scraped (None with --no-journal).
+JOURNAL: Optional[Journal] = None
+# Full protocol results of the event being scraped (--results-store).
+RESULTS_STORE: Optional[ResultsStore] = None
+# Historical ranks for seeding (--warehouse).
+WAREHOUSE: Optional[Warehouse] = None
+# --offline: every GET is answered from this bundle, never the network.
+SNAPSHOT: Optional[SnapshotReader] = None
+# --snapshot-out: every response body of the run is also packed into this bundle.
+SNAPSHOT_WRITER: Optional[SnapshotWriter] = None
+# Names missing from the event's athlete lists, resolved once it is scraped (None with --no-resolve-names).
+RESOLVER: Optional[NameResolver] = None
+
 
 def extract_comp_id(url: str) -> str:
     """
@@ -46,24 +161,276 @@ def extract_comp_id(url: str) -> str:
     return ""
 
 
-def http_get_json(session: requests.Session, url: str, retries: int = 3, timeout: int = 20) -> Any:
+def stage(name: str) -> ContextManager[None]:
+    """
+    Time a pipeline stage (meta, athletes, protocol, merge, dedupe, write) in METRICS.
+    """
+    return METRICS.stage(name) if METRICS is not None else nullcontext()
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Classify an API URL as meta / athletes / protocol / listing / profile / other.
+    """
+    if re.search(r"/competitions/?(?:\?|$)", url):
+        return "listing"
+    if re.search(r"/users/[a-f0-9]+/?(?:\?|$)", url):
+        return "profile"
+    m = re.search(r"/competitions/[a-f0-9]+(/[a-z]+)?/?(?:\?|$)", url)
+    if not m:
+        return "other"
+    suffix = m.group(1)
+    if suffix is None:
+        return "meta"
+    return {"/athletes": "athletes", "/protocol": "protocol"}.get(suffix, "other")
+
+
+@contextmanager
+def _limited_get(
+    session: requests.Session,
+    url: str,
+    timeout: int,
+    headers: Dict[str, str],
+    attempt: Optional[Attempt] = None,
+) -> Iterator[Tuple[requests.Response, Optional[float]]]:
+    """
+    Streamed GET through the shared limiter (if any), yielding (response,
+    Retry-After seconds). The slot is held until the body has been consumed.
+    """
+    limiter = LIMITER
+    with limiter.slot() if limiter is not None else nullcontext():
+        if attempt is not None:
+            attempt.sent()
+        started = time.monotonic()
+        try:
+            r = session.get(url, timeout=timeout, headers=headers, stream=True)
+        except requests.RequestException:
+            if limiter is not None:
+                limiter.record(None, time.monotonic() - started)
+            raise
+        with r:
+            if limiter is None:
+                yield r, parse_retry_after(r.headers.get("Retry-After"))
+                return
+            retry_after = parse_retry_after(r.headers.get("Retry-After")) if r.status_code in (429, 503) else None
+            limiter.record(r.status_code, time.monotonic() - started, retry_after)
+            yield r, retry_after
+
+
+def _load_json(chunks: Iterable[bytes]) -> Any:
+    return json.loads(b"".join(chunks))
+
+
+def http_get_json(
+    session: requests.Session, url: str, retries: Optional[int] = None, timeout: int = 20
+) -> Any:
+    return http_get(session, url, _load_json, retries, timeout)
+
+
+def http_get_records(
+    session: requests.Session,
+    url: str,
+    array_keys: Tuple[str, ...],
+    fields: FieldSpec,
+    retries: Optional[int] = None,
+    timeout: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Only `fields` of each element of the record array, parsed as the body streams in.
+    """
+
+    def consume(chunks: Iterable[bytes]) -> List[Dict[str, Any]]:
+        backend = JSON_BACKEND
+        if backend is None and not getattr(chunks, "streamable", False):
+            backend = "full"
+        return list(iter_records(chunks, array_keys, fields, backend))
+
+    return http_get(session, url, consume, retries, timeout)
+
+
+def http_get(
+    session: requests.Session,
+    url: str,
+    consume: Callable[[Iterable[bytes]], Any],
+    retries: Optional[int] = None,
+    timeout: int = 20,
+) -> Any:
+    """
+    GET `url` and return consume(body chunks); cached, rate limited and retried.
+    """
+    metrics = METRICS
+    if metrics is None:
+        return _http_get(session, url, consume, retries, timeout, {})
+    info: Dict[str, Any] = {"status": None, "bytes": 0, "retries": 0, "source": "network"}
+    started = time.perf_counter()
+    try:
+        return _http_get(session, url, consume, retries, timeout, info)
+    finally:
+        metrics.record_request(
+            RequestRecord(
+                endpoint_name(url),
+                url,
+                info["status"],
+                time.perf_counter() - started,
+                info["bytes"],
+                info["retries"],
+                info["source"],
+            )
+        )
+
+
+def _stored_body(body: bytes) -> "_Body":
+    """
+    A cached or snapshot body, chunked like a response so large ones stream too.
+    """
+    chunks = (body[i:i + READ_CHUNK] for i in range(0, len(body), READ_CHUNK))
+    return _Body(chunks, len(body) > STREAM_MIN_BYTES)
+
+
+class _Body:
+    """
+    A response's body chunks; `streamable` when they are worth parsing incrementally.
+    """
+
+    __slots__ = ("_chunks", "streamable")
+
+    def __init__(self, chunks: Iterator[bytes], streamable: bool) -> None:
+        self._chunks = chunks
+        self.streamable = streamable
+
+    def __iter__(self) -> "_Body":
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._chunks)
+
+
+def _body_chunks(
+    r: requests.Response, state: Dict[str, Any], copy: Optional[bytearray], attempt: Optional[Attempt]
+) -> Iterator[bytes]:
+    for chunk in r.iter_content(READ_CHUNK):
+        if attempt is not None and attempt.cancelled:
+            raise Cancelled(r.url)
+        state["bytes"] += len(chunk)
+        if copy is not None:
+            copy += chunk
+        yield chunk
+
+
+def _get_once(
+    session: requests.Session,
+    url: str,
+    consume: Callable[[Iterable[bytes]], Any],
+    timeout: int,
+    headers: Dict[str, str],
+    keep_body: bool,
+    state: Dict[str, Any],
+    attempt: Optional[Attempt] = None,
+) -> Tuple[Any, Optional[bytes], Any]:
+    """
+    One attempt: (consume(body), raw body if keep_body, response headers); the
+    data is NOT_MODIFIED on a 304. Fills `state` (status, bytes, retry_after).
+    """
+    with _limited_get(session, url, timeout, headers, attempt) as (r, retry_after):
+        state.update(status=r.status_code, retry_after=retry_after)
+        if attempt is not None and attempt.cancelled:
+            raise Cancelled(url)
+        if r.status_code == 304 and headers:
+            return NOT_MODIFIED, None, r.headers
+        r.raise_for_status()
+        # A kept body is copied as it streams through the parser: raw bytes for the
+        # cache / snapshot, never a decoded tree of a large payload.
+        body = bytearray() if keep_body else None
+        size = r.headers.get("Content-Length", "")
+        streamable = size.isdigit() and int(size) > STREAM_MIN_BYTES
+        chunks = _Body(_body_chunks(r, state, body, attempt), streamable)
+        data = consume(chunks)
+        for _ in chunks:  # a streaming consumer may stop at the end of its array
+            pass
+        return data, bytes(body) if body is not None else None, r.headers
+
+
+def _http_get(
+    session: requests.Session,
+    url: str,
+    consume: Callable[[Iterable[bytes]], Any],
+    retries: Optional[int],
+    timeout: int,
+    info: Dict[str, Any],
+) -> Any:
+    """
+    http_get body; fills `info` (status, bytes, retries, source) for instrumentation.
+    """
+    if SNAPSHOT is not None:
+        body = SNAPSHOT.get(url)
+        info.update(status=200, bytes=len(body), source="snapshot")
+        return consume(_stored_body(body))
+    retries = HTTP_RETRIES if retries is None else retries
+    limiter = LIMITER
+    cache = RESPONSE_CACHE
+    recorder = SNAPSHOT_WRITER
+    cached = cache.get(url, CACHE_TTLS[endpoint_name(url)]) if cache is not None else None
+    if cached is not None and cached.fresh:
+        info.update(status=200, bytes=len(cached.body), source="cache")
+        if recorder is not None:
+            recorder.add(url, cached.body)
+        return consume(_stored_body(cached.body))
+    headers = cached.validators() if cached is not None else {}
+    # The raw body is only kept when it is going into the cache or a snapshot.
+    keep_body = cache is not None or recorder is not None
+    hedger = HEDGER
+    endpoint = endpoint_name(url)
+
     last_err = None
     for attempt in range(1, retries + 1):
+        info.update(retries=attempt - 1, bytes=0)
+        # One state per attempt: a hedged attempt runs next to its duplicate.
+        states: List[Dict[str, Any]] = []
+
+        def once(handle: Optional[Attempt] = None) -> Tuple[Tuple[Any, Optional[bytes], Any], Dict[str, Any]]:
+            state: Dict[str, Any] = {"status": None, "bytes": 0, "retry_after": None}
+            states.append(state)
+            return _get_once(session, url, consume, timeout, headers, keep_body, state, handle), state
+
         try:
-            r = session.get(url, timeout=timeout)
-            r.raise_for_status()
-            return r.json()
+            if hedger is None:
+                result, how = once(), "primary"
+            else:
+                result, how = hedger.run(endpoint, once)
+            (data, body, resp_headers), state = result
+            info.update(status=state["status"], bytes=state["bytes"])
+            if how != "primary" and METRICS is not None:
+                METRICS.incr("hedged_requests")
+            if data is NOT_MODIFIED:
+                cache.revalidated(url)
+                info.update(bytes=len(cached.body), source="revalidated")
+                if recorder is not None:
+                    recorder.add(url, cached.body)
+                return consume(_stored_body(cached.body))
+            if how == "hedge":
+                info["source"] = "hedge"
+            if cache is not None:
+                cache.put(url, body, resp_headers.get("ETag"), resp_headers.get("Last-Modified"))
+            if recorder is not None:
+                recorder.add(url, body)
+            return data
         except Exception as e:
             last_err = e
-            if attempt < retries:
-                time.sleep(0.6 * attempt)
+            state = states[0] if states else {"status": None, "bytes": 0, "retry_after": None}
+            info.update(status=state["status"], bytes=state["bytes"])
+            retry_after = max((s["retry_after"] or 0.0 for s in states), default=0.0) or None
+            if attempt >= retries:
+                break
+            if limiter is None:
+                time.sleep(max(0.6 * attempt, retry_after or 0.0))
+            elif limiter.allow_retry():
+                time.sleep(limiter.backoff(attempt, retry_after))
+            else:
+                # Global retry budget exhausted: fail fast instead of piling on.
+                break
     raise last_err if last_err else RuntimeError(f"GET failed: {url}")
 
 
-def competition_title_only(title: str) -> str:
-    return title.split(" - ")[0].strip() if " - " in title else (title or "").strip()
-
-
 def sanitize_filename(name: str) -> str:
     categories = {
         "w1", "n2.2", "n2", "n1.1", "w0",
@@ -78,49 +445,11 @@ def sanitize_filename(name: str) -> str:
     return safe.replace(" ", "_") or "competition"
 
 
-def fetch_competition_meta(session: requests.Session, comp_id: str) -> Tuple[str, str]:
+def fetch_competition_meta(session: requests.Session, comp_id: str) -> Competition:
     """
-    Return (title_trimmed, category) from /competitions/{id}
+    Title (trimmed), category and date of /competitions/{id}.
     """
-    comp_url = f"{API_BASE}/competitions/{comp_id}"
-    comp_obj = http_get_json(session, comp_url)
-    if isinstance(comp_obj, list):
-        comp_obj = comp_obj[0] if comp_obj else {}
-
-    raw_title = str(comp_obj.get("title", "")).strip()
-    title_trimmed = competition_title_only(raw_title)
-
-    category = str(
-        comp_obj.get("limitationGroup")
-        or comp_obj.get("limitation_group")
-        or comp_obj.get("category")
-        or comp_obj.get("group")
-        or ""
-    ).strip()
-
-    if category == 'Empty':
-        category = 'h1'
-
-    return title_trimmed, category
-
-
-def _athlete_full_name(a: Dict[str, Any]) -> str:
-    first = str(a.get("name") or a.get("firstName") or "").strip()
-    last = str(a.get("lastName") or a.get("surname") or "").strip()
-    full = (first + " " + last).strip()
-    if not full:
-        full = str(a.get("fullName") or a.get("displayName") or "").strip()
-    return full
-
-
-def _athlete_user_id(a: Dict[str, Any]) -> Optional[str]:
-    return (
-        a.get("userId")
-        or a.get("user_id")
-        or a.get("id")
-        or (a.get("user") or {}).get("id")
-        or None
-    )
+    return Competition.from_api(comp_id, http_get_json(session, f"{API_BASE}/competitions/{comp_id}"))
 
 
 def build_user_map(session: requests.Session, comp_id: str) -> Dict[str, str]:
@@ -128,53 +457,163 @@ def build_user_map(session: requests.Session, comp_id: str) -> Dict[str, str]:
     Build {userId: full name} using /competitions/{id}/athletes
     """
     url = f"{API_BASE}/competitions/{comp_id}/athletes"
-    obj = http_get_json(session, url)
-
-    if isinstance(obj, dict) and "data" in obj:
-        athletes = obj["data"] or []
-    elif isinstance(obj, list):
-        athletes = obj
-    else:
-        athletes = []
+    athletes = http_get_records(session, url, ("data",), ATHLETE_FIELDS)
 
     user_map: Dict[str, str] = {}
     for a in athletes:
-        uid = _athlete_user_id(a)
-        if not uid:
-            continue
-        name = _athlete_full_name(a)
-        if name:
-            user_map[str(uid)] = name
+        athlete = Athlete.from_api(a)
+        if athlete is not None:
+            user_map[athlete.user_id] = athlete.name
     return user_map
 
 
-def fetch_protocol(session: requests.Session, comp_id: str) -> List[Dict[str, Any]]:
+def fetch_protocol(session: requests.Session, comp_id: str) -> List[ProtocolEntry]:
     """
-    Return list of protocol entries (each with rank and userId).
+    Protocol entries in rank order (with points and results when the results store is on).
     """
     url = f"{API_BASE}/competitions/{comp_id}/protocol"
-    obj = http_get_json(session, url)
-
-    protocol = []
-    if isinstance(obj, dict) and isinstance(obj.get("protocol"), list):
-        protocol = obj["protocol"]
-    elif isinstance(obj, list):
-        # In case API ever returns a raw list
-        protocol = obj
-    else:
-        protocol = []
+    full = RESULTS_STORE is not None
+    records = http_get_records(session, url, ("protocol",), PROTOCOL_RESULT_FIELDS if full else PROTOCOL_FIELDS)
 
     # Keep only entries that have userId and rank
-    cleaned = []
+    protocol = [e for e in (ProtocolEntry.from_api(r, full) for r in records) if e is not None]
+    protocol.sort(key=lambda e: e.rank)
+    return protocol
+
+
+def fetch_profile_name(session: requests.Session, user_id: str) -> Optional[str]:
+    """
+    Full name from the user's profile, or None when there is none.
+    """
+    try:
+        profile = http_get_json(session, API_BASE + PROFILE_PATH.format(id=user_id), retries=PROFILE_RETRIES)
+    except Exception as e:
+        print(f"[SKIP] profile userId={user_id} -> {e}")
+        return None
+    if isinstance(profile, dict) and isinstance(profile.get("data"), dict):
+        profile = profile["data"]
+    return (athlete_name(profile) or None) if isinstance(profile, dict) else None
+
+
+def resolve_user_map(
+    session: requests.Session, comp_id: str, protocol: List[ProtocolEntry]
+) -> Dict[str, str]:
+    """
+    {userId: name} for the protocol's athletes. Served from the athlete store when it
+    knows all of them; otherwise /athletes is fetched and its names are upserted.
+    """
+    store = ATHLETE_STORE
+    if store is None:
+        return build_user_map(session, comp_id)
+
+    known = store.lookup(e.user_id for e in protocol)
+    if all(e.user_id in known for e in protocol):
+        return known
+    user_map = build_user_map(session, comp_id)
+    store.upsert(user_map)
+    known.update(user_map)
+    return known
+
+
+def merge_rows(
+    protocol: List[ProtocolEntry], user_map: Dict[str, str], category: str
+) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    Map protocol order to (name, category) rows. Returns (rows, missing_names).
+    """
+    rows: List[Tuple[str, str]] = []
+    missing = 0
     for entry in protocol:
-        user_id = entry.get("userId")
-        rank = entry.get("rank")
-        if user_id is None or rank is None:
-            continue
-        cleaned.append({"userId": str(user_id), "rank": int(rank)})
-    # Sort by rank (ascending)
-    cleaned.sort(key=lambda x: x["rank"])
-    return cleaned
+        uid = entry.user_id
+        # Map protocol order to athlete name by userId
+        name = user_map.get(uid)
+        if not name:
+            # fallback: leave name as userId tail (filled in later if it resolves), keep row to preserve order
+            name = PendingName(uid)
+            missing += 1
+        rows.append((name, category))
+    return rows, missing
+
+
+def _print_ok(comp_id: str, rows: List[Tuple[str, str]], missing: int, category: str) -> None:
+    print(
+        f"[OK] compId={comp_id} -> {len(rows)} athletes (ordered by protocol), "
+        f"missing_names={missing}, category='{category}'"
+    )
+
+
+def from_journal(comp_id: str) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    (title, rows) rebuilt from the journal when this comp already completed.
+    """
+    entry = JOURNAL.get(comp_id) if JOURNAL is not None else None
+    if entry is None:
+        return None
+    # A sink of this run may need what the original run did not journal.
+    if (RESULTS_STORE is not None and any(e.results is None for e in entry.protocol)) or (
+        WAREHOUSE is not None and entry.date is None
+    ):
+        print(f"[JOURNAL] compId={comp_id} -> journaled without results or date, fetching again")
+        return None
+    rows, missing = merge_rows(entry.protocol, entry.names, entry.category)
+    print(
+        f"[JOURNAL] compId={comp_id} -> {len(rows)} athletes, "
+        f"missing_names={missing}, category='{entry.category}'"
+    )
+    if METRICS is not None:
+        METRICS.incr("journal_hits")
+    note_names(entry.protocol, entry.names)
+    # The results store is written per run and the warehouse replaces a comp's rows,
+    # so a resumed run sends journaled comps to both like fetched ones.
+    store_results(comp_id, entry.title, entry.category, entry.protocol, entry.names)
+    warehouse_result(comp_id, entry.title, entry.category, entry.date or "", entry.protocol, entry.names)
+    return entry.title, rows
+
+
+def note_names(protocol: List[ProtocolEntry], user_map: Dict[str, str]) -> None:
+    if RESOLVER is not None:
+        RESOLVER.note_names(user_map)
+        RESOLVER.note_missing(protocol, user_map)
+
+
+def journal_result(
+    comp_id: str,
+    title: str,
+    category: str,
+    date: str,
+    protocol: List[ProtocolEntry],
+    user_map: Dict[str, str],
+) -> None:
+    if JOURNAL is not None:
+        JOURNAL.record(comp_id, title, category, date, protocol, user_map)
+
+
+def store_results(
+    comp_id: str,
+    title: str,
+    category: str,
+    protocol: List[ProtocolEntry],
+    user_map: Dict[str, str],
+) -> None:
+    if RESULTS_STORE is not None:
+        RESULTS_STORE.add(comp_id, title, category, protocol, user_map)
+
+
+def warehouse_result(
+    comp_id: str,
+    title: str,
+    category: str,
+    date: str,
+    protocol: List[ProtocolEntry],
+    user_map: Dict[str, str],
+) -> None:
+    if WAREHOUSE is not None:
+        WAREHOUSE.record(comp_id, title, category, date, protocol, user_map)
+
+
+def journal_failure(comp_id: str, error: Exception) -> None:
+    if JOURNAL is not None:
+        JOURNAL.record_failure(comp_id, str(error))
 
 
 def scrape_one(session: requests.Session, url: str) -> Tuple[str, List[Tuple[str, str]]]:
@@ -182,35 +621,205 @@ def scrape_one(session: requests.Session, url: str) -> Tuple[str, List[Tuple[str
     if not comp_id:
         print(f"[SKIP] {url} -> no compId found")
         return "", []
+    done = from_journal(comp_id)
+    if done is not None:
+        return done
 
     try:
-        title_trimmed, category = fetch_competition_meta(session, comp_id)
-        user_map = build_user_map(session, comp_id)
-        protocol = fetch_protocol(session, comp_id)
-
-        rows: List[Tuple[str, str]] = []
-        missing = 0
-        for item in protocol:
-            uid = item["userId"]
-            # Map protocol order to athlete name by userId
-            name = user_map.get(uid)
-            if not name:
-                # fallback: leave name as userId tail, but keep row to preserve order
-                tail = uid[-6:] if len(uid) >= 6 else uid
-                name = f"Unknown_{tail}"
-                missing += 1
-            rows.append((name, category))
+        with stage("meta"):
+            comp = fetch_competition_meta(session, comp_id)
+        with stage("protocol"):
+            protocol = fetch_protocol(session, comp_id)
+        with stage("athletes"):
+            user_map = resolve_user_map(session, comp_id, protocol)
 
-        print(
-            f"[OK] compId={comp_id} -> {len(rows)} athletes (ordered by protocol), "
-            f"missing_names={missing}, category='{category}'"
+        with stage("merge"):
+            rows, missing = merge_rows(protocol, user_map, comp.category)
+        note_names(protocol, user_map)
+        journal_result(comp_id, comp.title, comp.category, comp.date, protocol, user_map)
+        store_results(comp_id, comp.title, comp.category, protocol, user_map)
+        warehouse_result(comp_id, comp.title, comp.category, comp.date, protocol, user_map)
+        _print_ok(comp_id, rows, missing, comp.category)
+        return comp.title, rows
+    except Exception as e:
+        print(f"[ERR] compId={comp_id} -> {e}")
+        journal_failure(comp_id, e)
+        return "", []
+
+
+async def scrape_one_async(
+    session: requests.Session, url: str, limit: asyncio.Semaphore
+) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Same as scrape_one, but meta and protocol (and athletes, unless the athlete
+    store already knows everyone) are requested concurrently. Every call holds
+    a slot of the shared `limit` while it is in flight.
+    """
+    comp_id = extract_comp_id(url)
+    if not comp_id:
+        print(f"[SKIP] {url} -> no compId found")
+        return "", []
+    done = from_journal(comp_id)
+    if done is not None:
+        return done
+
+    def timed(name: str, fn: Callable[..., Any], *extra: Any) -> Any:
+        with stage(name):
+            return fn(session, comp_id, *extra)
+
+    async def call(name: str, fn: Callable[..., Any], *extra: Any) -> Any:
+        async with limit:
+            return await asyncio.to_thread(timed, name, fn, *extra)
+
+    try:
+        if ATHLETE_STORE is None:
+            comp, user_map, protocol = await asyncio.gather(
+                call("meta", fetch_competition_meta),
+                call("athletes", build_user_map),
+                call("protocol", fetch_protocol),
+            )
+        else:
+            comp, protocol = await asyncio.gather(
+                call("meta", fetch_competition_meta),
+                call("protocol", fetch_protocol),
+            )
+            user_map = await call("athletes", resolve_user_map, protocol)
+        with stage("merge"):
+            rows, missing = merge_rows(protocol, user_map, comp.category)
+        note_names(protocol, user_map)
+        # fsync off the event loop
+        await asyncio.to_thread(
+            journal_result, comp_id, comp.title, comp.category, comp.date, protocol, user_map
         )
-        return title_trimmed, rows
+        store_results(comp_id, comp.title, comp.category, protocol, user_map)
+        await asyncio.to_thread(
+            warehouse_result, comp_id, comp.title, comp.category, comp.date, protocol, user_map
+        )
+        _print_ok(comp_id, rows, missing, comp.category)
+        return comp.title, rows
     except Exception as e:
         print(f"[ERR] compId={comp_id} -> {e}")
+        await asyncio.to_thread(journal_failure, comp_id, e)
         return "", []
 
 
+def load_comp_snapshot(
+    session: requests.Session, comp_id: str, previous: Optional[CompSnapshot]
+) -> CompSnapshot:
+    """
+    One comp for the service. A refresh re-fetches only the protocol; meta and the
+    user map are reused unless athletes joined since the previous snapshot.
+    """
+    if previous is None:
+        comp = fetch_competition_meta(session, comp_id)
+        title_trimmed, category = comp.title, comp.category
+    else:
+        title_trimmed, category = previous.title, previous.category
+    protocol = fetch_protocol(session, comp_id)
+    known = {e.user_id for e in previous.protocol} if previous is not None else set()
+    if previous is not None and all(e.user_id in known for e in protocol):
+        user_map = previous.user_map
+    else:
+        user_map = resolve_user_map(session, comp_id, protocol)
+    rows, _ = merge_rows(protocol, user_map, category)
+    return CompSnapshot(comp_id, title_trimmed, category, protocol, user_map, rows, time.time())
+
+
+ScrapeResult = Tuple[int, str, List[Tuple[str, str]]]
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """
+    Session whose connection pool is large enough for `pool_size` concurrent calls.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def run_threads(session: requests.Session, urls: Iterable[str], workers: int) -> Iterator[ScrapeResult]:
+    """
+    Yield (url index, title, rows) per competition in completion order.
+    `urls` may be lazy (discovery): each URL is submitted as soon as it arrives.
+    """
+    done: "queue.Queue[Tuple[int, Future]]" = queue.Queue()
+    pending = 0
+
+    def result(idx: int, fut: Future) -> ScrapeResult:
+        title_trimmed, rows = fut.result()
+        return idx, title_trimmed, rows
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for idx, url in enumerate(urls):
+            fut = ex.submit(scrape_one, session, url)
+            fut.add_done_callback(lambda f, idx=idx: done.put((idx, f)))
+            pending += 1
+            # Hand back whatever already finished before waiting for the next URL.
+            while not done.empty():
+                pending -= 1
+                yield result(*done.get())
+        while pending:
+            pending -= 1
+            yield result(*done.get())
+
+
+async def _scrape_all_async(
+    session: requests.Session,
+    urls: Iterable[str],
+    concurrency: int,
+    emit: Callable[[ScrapeResult], None],
+) -> None:
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency + 1))
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(idx: int, url: str) -> None:
+        title_trimmed, rows = await scrape_one_async(session, url, limit)
+        emit((idx, title_trimmed, rows))
+
+    # `urls` may block (discovery), so it is advanced off the event loop.
+    it = iter(urls)
+    tasks = []
+    idx = 0
+    while True:
+        url = await asyncio.to_thread(next, it, None)
+        if url is None:
+            break
+        tasks.append(asyncio.create_task(one(idx, url)))
+        idx += 1
+    await asyncio.gather(*tasks)
+
+
+def run_async(session: requests.Session, urls: Iterable[str], concurrency: int) -> Iterator[ScrapeResult]:
+    """
+    Yield (url index, title, rows) per competition in completion order.
+    The event loop runs on a helper thread so results stream out while others are in flight.
+    """
+    results: "queue.Queue[Optional[ScrapeResult]]" = queue.Queue()
+    errors: List[BaseException] = []
+
+    def runner() -> None:
+        try:
+            asyncio.run(_scrape_all_async(session, urls, concurrency, results.put))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            results.put(None)
+
+    t = threading.Thread(target=runner, name="scraper-async", daemon=True)
+    t.start()
+    while True:
+        item = results.get()
+        if item is None:
+            break
+        yield item
+    t.join()
+    if errors:
+        raise errors[0]
+
+
 def write_csv(filename: str, rows: List[Tuple[str, str]]) -> None:
     with open(filename, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -222,15 +831,20 @@ def print_duplicate_names(rows: List[Tuple[str, str]]) -> None:
     """
     Print duplicated names (ignoring category), showing category counts when repeated.
     """
-    name_to_categories: Dict[str, List[str]] = defaultdict(list)
+    name_counts: Dict[str, Counter] = defaultdict(Counter)
     for name, category in rows:
-        name_to_categories[name].append(category)
+        name_counts[name][category] += 1
+    report_duplicate_names(name_counts)
+
 
+def report_duplicate_names(name_counts: Dict[str, Counter]) -> None:
+    """
+    print_duplicate_names for pre-aggregated {name: Counter(category)}.
+    """
     duplicates: List[Tuple[str, str]] = []
-    for name, categories in name_to_categories.items():
-        if len(categories) <= 1:
+    for name, counts in name_counts.items():
+        if sum(counts.values()) <= 1:
             continue
-        counts = Counter(categories)
         parts = [f"{cat} x{cnt}" for cat, cnt in counts.items() if cnt > 1]
         if not parts:
             # Name duplicated but categories unique; still show categories seen once.
@@ -260,28 +874,597 @@ def dedupe_rows(rows: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
     return unique_rows
 
 
-def main():
-    if not URLS:
-        print("Add URLs to the URLS list.")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Scrape allstrongman protocols into a name,category CSV.")
+    p.add_argument(
+        "--engine",
+        choices=("threads", "async"),
+        default="threads",
+        help="threads: one worker per comp, calls in sequence; "
+        "async: meta/athletes/protocol in parallel, all comps under one limit",
+    )
+    p.add_argument("--api-base", default=API_BASE, help="API root, e.g. a local mock_api.py")
+    p.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="thread engine worker count")
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=ASYNC_CONCURRENCY,
+        help="async engine: max API calls in flight across all comps",
+    )
+    p.add_argument("--discover-event", default=None, metavar="ID", help="scrape every comp listed for an event")
+    p.add_argument("--discover-organizer", default=None, metavar="ID", help="scrape every comp of an organizer")
+    p.add_argument(
+        "--listing-url",
+        default=None,
+        help="discovery: custom paged listing URL (page/limit are appended)",
+    )
+    p.add_argument("--since", default=None, metavar="YYYY-MM-DD", help="discovery: comps on/after date")
+    p.add_argument("--until", default=None, metavar="YYYY-MM-DD", help="discovery: comps on/before date")
+    p.add_argument("--title-match", default=None, metavar="REGEX", help="discovery: title filter")
+    p.add_argument(
+        "--category",
+        action="append",
+        default=None,
+        help="discovery: keep only this limitationGroup (repeatable)",
+    )
+    p.add_argument("--retries", type=int, default=HTTP_RETRIES, help="attempts per API call")
+    p.add_argument(
+        "--no-adaptive",
+        action="store_true",
+        help="disable the shared token bucket / AIMD concurrency limiter",
+    )
+    p.add_argument("--rate", type=float, default=RATE_LIMIT, help="adaptive: max requests per second (0 = no cap)")
+    p.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=MAX_CONCURRENCY,
+        help="adaptive: ceiling for in-flight requests; --max-workers / --concurrency is where it starts",
+    )
+    p.add_argument(
+        "--hedge",
+        action="store_true",
+        help="send a duplicate request when one is slower than recent latencies; first answer wins",
+    )
+    p.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=HEDGE_PERCENTILE,
+        help="hedge: latency percentile (per endpoint) after which the duplicate is sent",
+    )
+    p.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=HEDGE_BUDGET,
+        help="hedge: max duplicates as a fraction of requests",
+    )
+    p.add_argument("--report", default=None, metavar="PATH", help="write a JSON run report")
+    p.add_argument("--prom", default=None, metavar="PATH", help="write a Prometheus textfile export")
+    p.add_argument(
+        "--profile",
+        default=None,
+        nargs="?",
+        const="scrape.prof",
+        metavar="PATH",
+        help="run under cProfile (all threads) + tracemalloc; pstats dump to PATH",
+    )
+    p.add_argument("--cache-dir", default=CACHE_DIR, help="directory for the on-disk response cache")
+    p.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB, help="LRU size cap of the cache")
+    p.add_argument("--no-cache", action="store_true", help="always fetch from the API")
+    p.add_argument(
+        "--athlete-db",
+        default=None,
+        help="persistent userId->name index (default: <cache-dir>/athletes.sqlite3)",
+    )
+    p.add_argument("--no-athlete-db", action="store_true", help="always fetch /athletes")
+    p.add_argument(
+        "--json-backend",
+        choices=("auto", "ijson", "python", "full"),
+        default="auto",
+        help="parser for protocol / athlete payloads; 'full' loads the whole body with json.loads, "
+        "'auto' does so unless the body is larger than 1MB, which is then streamed",
+    )
+    p.add_argument("--format", choices=("csv", "ndjson"), default="csv", help="output format")
+    p.add_argument("--gzip", action="store_true", help="gzip-compress the output file")
+    p.add_argument(
+        "--fuzzy-dupes",
+        action="store_true",
+        help="also report likely duplicate athletes (transliteration, swapped names, case/whitespace)",
+    )
+    p.add_argument(
+        "--merge-dupes",
+        action="store_true",
+        help="rewrite fuzzy duplicates to one canonical spelling in the output (implies --fuzzy-dupes)",
+    )
+    p.add_argument("--fuzzy-threshold", type=float, default=DEFAULT_THRESHOLD, help="similarity needed to match")
+    p.add_argument(
+        "--firestore-exercise",
+        default=None,
+        metavar="EXERCISE_ID",
+        help="also add the rows to exercises/<id>/competitors (set FIRESTORE_EMULATOR_HOST for the emulator)",
+    )
+    p.add_argument(
+        "--firestore-project",
+        default=None,
+        help="Firebase project id (default: VITE_FIREBASE_PROJECT_ID from ../.env)",
+    )
+    p.add_argument(
+        "--journal",
+        default=JOURNAL_FILE,
+        metavar="PATH",
+        help="append-only completion journal (batch mode keeps one per event in --out-dir)",
+    )
+    p.add_argument("--no-journal", action="store_true", help="do not journal completed comps")
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="reuse the journal: fetch only missing / failed comps and rebuild the output",
+    )
+    p.add_argument(
+        "--no-resolve-names",
+        action="store_true",
+        help="keep Unknown_<id> rows instead of looking the names up once the event is scraped",
+    )
+    p.add_argument(
+        "--profile-path",
+        default=PROFILE_PATH,
+        help="per-user profile endpoint under --api-base, e.g. /users/{id}, for names no athlete list "
+        "or the athlete store had (default: not asked)",
+    )
+    p.add_argument(
+        "--merge-policy",
+        choices=POLICIES,
+        default="concat",
+        help="cross-comp row order: comps in URL order, interleaved by rank, or categories in turn",
+    )
+    p.add_argument(
+        "--merge-weights",
+        type=parse_weights,
+        default={},
+        metavar="CAT=N,...",
+        help="round-robin: athletes per turn for a category (default 1)",
+    )
+    p.add_argument(
+        "--results-store",
+        default=None,
+        metavar="DIR",
+        help="also keep full protocol results (Parquet, partitioned by event/category) under DIR",
+    )
+    p.add_argument(
+        "--warehouse",
+        default=None,
+        metavar="PATH",
+        help="upsert every comp's ranks into this SQLite warehouse (see warehouse.py for seeding)",
+    )
+    p.add_argument(
+        "--snapshot-out",
+        default=None,
+        metavar="PATH",
+        help="pack every API response of this run into a portable bundle for --offline",
+    )
+    p.add_argument(
+        "--offline",
+        default=None,
+        metavar="PATH",
+        help="answer every API call from a --snapshot-out bundle, with no network access",
+    )
+    p.add_argument(
+        "--manifest",
+        default=None,
+        metavar="PATH",
+        help="batch mode: JSON list of events (name + compIds/urls/eventId), one output file each",
+    )
+    p.add_argument("--out-dir", default="batch_out", help="batch: directory for event files and index.json")
+    p.add_argument(
+        "--batch-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="batch: worker processes (each runs its own engine and session)",
+    )
+    p.add_argument(
+        "--serve",
+        default=None,
+        metavar="[HOST:]PORT",
+        help="daemon mode: serve /events/{id}.csv and /protocols/{compId} from a warm session",
+    )
+    p.add_argument("--serve-ttl", type=float, default=SERVE_TTL, help="serve: seconds before a protocol is refreshed")
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep polling protocols and emit only added/removed/changed ranks",
+    )
+    p.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="watch: seconds between polls")
+    p.add_argument("--jitter", type=float, default=WATCH_JITTER, help="watch: +/- fraction of interval")
+    p.add_argument("--watch-format", choices=("ndjson", "csv"), default="ndjson")
+    p.add_argument("--watch-out", default="-", help="watch: output file (appended), '-' for stdout")
+    p.add_argument("--watch-ticks", type=int, default=None, help="watch: stop after N polls")
+    return p.parse_args(argv)
+
+
+def open_cache(cache_dir: str, max_mb: int) -> ResponseCache:
+    os.makedirs(cache_dir, exist_ok=True)
+    return ResponseCache(os.path.join(cache_dir, "responses.sqlite3"), max_mb * 1024 * 1024)
+
+
+def open_athlete_store(path: Optional[str], cache_dir: str) -> AthleteStore:
+    if path is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, "athletes.sqlite3")
+    return AthleteStore(path)
+
+
+def discovery_listing(args: argparse.Namespace) -> Optional[str]:
+    if args.listing_url:
+        return args.listing_url
+    if args.discover_event:
+        return API_BASE + DISCOVERY_LISTINGS["event"].format(id=args.discover_event)
+    if args.discover_organizer:
+        return API_BASE + DISCOVERY_LISTINGS["organizer"].format(id=args.discover_organizer)
+    return None
+
+
+def discover_urls(session: requests.Session, listing: str, args: argparse.Namespace) -> Iterator[str]:
+    """
+    Comp page URLs for every matching competition, yielded as listing pages arrive.
+    """
+    flt = DiscoveryFilter(args.since, args.until, args.title_match, tuple(args.category or ()))
+    count = 0
+    for comp_id in discover(
+        lambda url: http_get_json(session, url), listing, flt, args.max_workers, DISCOVERY_PAGE_SIZE
+    ):
+        count += 1
+        print(f"[FOUND] compId={comp_id}")
+        yield COMP_PAGE_URL.format(comp_id)
+    print(f"[DISCOVERY] {count} competition(s) from {listing}")
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """
+    Serve protocols and event CSVs over HTTP from one warm session until interrupted.
+    """
+    host, _, port = args.serve.rpartition(":")
+    flt = DiscoveryFilter(args.since, args.until, args.title_match, tuple(args.category or ()))
+    # Request fan-out and background refreshes each get max_workers connections.
+    session = make_session(2 * args.max_workers)
+
+    def event_comp_ids(event_id: str) -> List[str]:
+        listing = API_BASE + DISCOVERY_LISTINGS["event"].format(id=event_id)
+        return list(
+            discover(lambda url: http_get_json(session, url), listing, flt, args.max_workers, DISCOVERY_PAGE_SIZE)
+        )
+
+    # One resolver for the process: an id is looked up in the store / profiles once,
+    # so polling an event does not repeat the lookups of names that were not found.
+    resolver = NameResolver()
+
+    def resolve_names(snaps: List[CompSnapshot]) -> Dict[str, str]:
+        # Same sources as a CLI run: the athlete lists seen so far, the store, profiles.
+        for snap in snaps:
+            resolver.note_names(snap.user_map)
+            resolver.note_missing(snap.protocol, snap.user_map)
+        return resolve_missing_names(session, resolver, args.max_workers, report=False) if resolver.missing else {}
+
+    service = ScraperService(
+        lambda comp_id, previous: load_comp_snapshot(session, comp_id, previous),
+        event_comp_ids,
+        comp_ttl=args.serve_ttl,
+        event_ttl=CACHE_TTLS["listing"],
+        workers=args.max_workers,
+        resolve_names=None if args.no_resolve_names else resolve_names,
+    )
+    server = make_server(service, host or "127.0.0.1", int(port))
+    print(f"[SERVE] http://{server.server_address[0]}:{server.server_address[1]} (API {API_BASE})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        session.close()
+
+
+def run_watch(session: requests.Session, urls: Iterable[str], args: argparse.Namespace) -> None:
+    """
+    Poll only /protocol for every comp; meta and athletes are fetched once for labels.
+    """
+    comp_ids = [cid for cid in (extract_comp_id(u) for u in urls) if cid]
+    labels: Dict[str, Tuple[str, Dict[str, str]]] = {}
+    for comp_id in comp_ids:
+        try:
+            category = fetch_competition_meta(session, comp_id).category
+            labels[comp_id] = (category, build_user_map(session, comp_id))
+        except Exception as e:
+            print(f"[ERR] compId={comp_id} -> {e}", file=sys.stderr)
+
+    out = sys.stdout if args.watch_out == "-" else open(args.watch_out, "a", newline="", encoding="utf-8")
+    try:
+        watcher = ProtocolWatcher(
+            comp_ids,
+            lambda comp_id: fetch_protocol(session, comp_id),
+            # Appending to an existing delta CSV must not repeat its header.
+            DeltaWriter(out, args.watch_format, header=out is sys.stdout or out.tell() == 0),
+            labels=labels,
+            workers=args.max_workers,
+        )
+        watcher.run(args.interval, args.jitter, args.watch_ticks)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    profiler = RunProfiler(args.profile) if args.profile else None
+    if profiler is not None:
+        profiler.start()
+    try:
+        run(args)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+def configure(args: argparse.Namespace, rate_share: float = 1.0) -> None:
+    """
+    Set the module-level API / cache / limiter state from the CLI args.
+    `rate_share` scales --rate for batch workers that split one budget.
+    """
+    global API_BASE, HTTP_RETRIES, JSON_BACKEND, RESPONSE_CACHE, ATHLETE_STORE, WAREHOUSE, LIMITER, METRICS
+    global SNAPSHOT, PROFILE_PATH, HEDGER
+    API_BASE = args.api_base
+    PROFILE_PATH = args.profile_path
+    if args.offline:
+        SNAPSHOT = SnapshotReader(args.offline)
+        # Bundle entries are keyed by full URL, so requests must be built on the same base.
+        API_BASE = SNAPSHOT.api_base
+    HTTP_RETRIES = args.retries
+    JSON_BACKEND = None if args.json_backend == "auto" else args.json_backend
+    METRICS = Metrics()
+    if not args.no_cache:
+        RESPONSE_CACHE = open_cache(args.cache_dir, args.cache_max_mb)
+    # An export must contain every /athletes body, so it cannot skip them via the store.
+    if not args.no_athlete_db and not args.snapshot_out:
+        ATHLETE_STORE = open_athlete_store(args.athlete_db, args.cache_dir)
+    if args.warehouse:
+        WAREHOUSE = Warehouse(args.warehouse)
+
+    pool_size = engine_pool_size(args)
+    if args.hedge and SNAPSHOT is None:
+        # Originals and duplicates of every caller (engine, discovery, serve pools);
+        # threads are only started on demand.
+        HEDGER = Hedger(args.hedge_percentile, args.hedge_budget, workers=4 * max(pool_size, args.max_workers))
+    if not args.no_adaptive:
+        rate = args.rate * rate_share
+        LIMITER = AdaptiveLimiter(
+            rate=rate,
+            burst=max(rate, 1.0),
+            initial=engine_concurrency(args),
+            max_concurrency=pool_size,
+        )
+
+
+def engine_concurrency(args: argparse.Namespace) -> int:
+    return args.concurrency if args.engine == "async" else args.max_workers
+
+
+def engine_pool_size(args: argparse.Namespace) -> int:
+    """
+    Workers / in-flight calls / connections the engine is sized for. With the
+    adaptive limiter this is its ceiling: LIMITER.slot() gates how many are
+    actually in flight, starting at --max-workers / --concurrency, so additive
+    increase has idle workers to hand slots to.
+    """
+    if args.no_adaptive:
+        return engine_concurrency(args)
+    return max(args.max_concurrency, engine_concurrency(args))
+
+
+def output_ext(args: argparse.Namespace) -> str:
+    return "." + args.format + (".gz" if args.gzip else "")
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.manifest:
+        run_batch(args)
+        return
+    configure(args)
+    if args.serve:
+        run_serve(args)
+        return
+    listing = discovery_listing(args)
+    if not URLS and listing is None:
+        print("Add URLs to the URLS list (or use --discover-event / --discover-organizer).")
+        return
+
+    if args.watch:
+        with make_session(args.max_workers) as session:
+            urls = list(discover_urls(session, listing, args)) if listing else URLS
+            run_watch(session, urls, args)
+        return
+
+    ext = output_ext(args)
+    # Rows stream into a partial file; it gets its final name once the title is known.
+    partial_name = f".scrape-{os.getpid()}.partial{ext}"
+    open_journal(args, args.journal)
+    open_results_store(args)
+    open_snapshot_writer(args)
+    summary: Optional[Dict[str, Any]] = None
+    try:
+        with make_session(engine_pool_size(args)) as session:
+            # Discovered comps are scraped while later listing pages are still loading.
+            urls = discover_urls(session, listing, args) if listing else URLS
+            summary = scrape_event(session, urls, args, partial_name)
+    finally:
+        close_journal()
+        close_results_store(sanitize_filename(summary["title"] or "competition") if summary else None)
+        close_snapshot_writer()
+        if summary is None and os.path.exists(partial_name):
+            os.remove(partial_name)
+
+    out_name = sanitize_filename(summary["title"] or "competition") + ext
+    os.replace(partial_name, out_name)
+    print(
+        f"\nSaved -> {out_name} with {summary['rows']} rows "
+        f"(removed {summary['duplicates']} duplicates"
+        + (f", merged {summary['fuzzy_merged']} fuzzy duplicates)" if summary["fuzzy_merged"] else ")")
+    )
+    write_reports(args, summary)
+
+
+def open_journal(args: argparse.Namespace, path: str) -> None:
+    global JOURNAL
+    if args.no_journal:
+        if args.resume:
+            raise SystemExit("--resume needs the journal; drop --no-journal")
         return
+    JOURNAL = Journal(path, resume=args.resume)
+    if args.resume:
+        print(
+            f"[RESUME] {len(JOURNAL)} comp(s) from {path}, {len(JOURNAL.failed)} failed to retry"
+            + (f", {JOURNAL.skipped_lines} unreadable line(s) ignored" if JOURNAL.skipped_lines else "")
+        )
+
+
+def close_journal() -> None:
+    global JOURNAL
+    if JOURNAL is not None:
+        JOURNAL.close()
+        JOURNAL = None
+
+
+def open_snapshot_writer(args: argparse.Namespace) -> None:
+    global SNAPSHOT_WRITER
+    if args.snapshot_out:
+        if args.resume:
+            # Comps restored from the journal are never fetched, so they would be missing.
+            raise SystemExit("--snapshot-out cannot be combined with --resume")
+        SNAPSHOT_WRITER = SnapshotWriter(args.snapshot_out, API_BASE)
+
+
+def close_snapshot_writer() -> None:
+    global SNAPSHOT_WRITER
+    writer, SNAPSHOT_WRITER = SNAPSHOT_WRITER, None
+    if writer is not None:
+        size = writer.close()
+        print(
+            f"[SNAPSHOT] {len(writer)} responses ({writer.raw_bytes / 1e6:.2f} MB) "
+            f"-> {writer.path} ({size / 1e6:.2f} MB)"
+        )
+
+
+def open_results_store(args: argparse.Namespace) -> None:
+    global RESULTS_STORE
+    if args.results_store:
+        RESULTS_STORE = ResultsStore(args.results_store)
+
+
+def close_results_store(event: Optional[str]) -> None:
+    """
+    Commit the stored results under event=<event>; None (a failed run) drops them.
+    """
+    global RESULTS_STORE
+    store, RESULTS_STORE = RESULTS_STORE, None
+    if store is None:
+        return
+    if event is None:
+        store.discard()
+        return
+    parts = store.commit(event)
+    print(f"[STORE] {store.rows} result rows from {store.comps} comp(s) -> {len(parts)} file(s) in {store.root}")
+
 
+def scrape_event(
+    session: requests.Session, urls: Iterable[str], args: argparse.Namespace, partial_name: str
+) -> Dict[str, Any]:
+    """
+    Scrape one event's comps into `partial_name` (deduped, in URL order) and
+    return its summary; the caller gives the file its final name.
+    """
+    global RESOLVER
+    RESOLVER = None if args.no_resolve_names else NameResolver()
+    # Rows that may still be rewritten (merged duplicates) reach the sink at the end.
+    sink_deferred = args.merge_dupes
     titles: List[Tuple[int, str]] = []
-    all_rows: List[Tuple[str, str]] = []
+    comps = failed = 0
+    sink: Optional[FirestoreSink] = None
+    if args.firestore_exercise:
+        project = args.firestore_project or project_from_dotenv(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env")
+        )
+        sink = FirestoreSink(args.firestore_exercise, project=project)
+    writer = RowWriter(partial_name, args.format, args.gzip)
+
+    def release(idx: int, rows: List[Tuple[str, str]]) -> None:
+        with stage("dedupe"):
+            unique = writer.dedupe(rows)
+        with stage("write"):
+            writer.write_unique(unique)
+            if sink is not None and not sink_deferred:
+                sink.add(unique)
+
+    # From the first comp with a missing name on, concat holds the rows back until
+    # the names are resolved, so they are written with the real names.
+    unnamed: List[List[Tuple[str, str]]] = []
 
-    with requests.Session() as session:
-        session.headers.update({"Accept": "application/json"})
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-            futures = {ex.submit(scrape_one, session, url): idx for idx, url in enumerate(URLS)}
-            for fut in as_completed(futures):
-                idx = futures[fut]
-                title_trimmed, rows = fut.result()
-                if title_trimmed:
-                    titles.append((idx, title_trimmed))
-                all_rows.extend(rows)
+    def release_named(idx: int, rows: List[Tuple[str, str]]) -> None:
+        if unnamed or (RESOLVER is not None and has_pending(rows)):
+            unnamed.append(rows)
+        else:
+            release(idx, rows)
 
-    print_duplicate_names(all_rows)
+    # concat streams comps out in URL order as they finish; the other policies
+    # need every comp's rows before the k-way merge can start.
+    held: Dict[int, List[Tuple[str, str]]] = {}
+    weights = args.merge_weights
+    buffer = ReorderBuffer(release_named if args.merge_policy == "concat" else held.__setitem__)
+    names: Dict[str, str] = {}
 
-    unique_rows = dedupe_rows(all_rows)
+    try:
+        if args.engine == "async":
+            results = run_async(session, urls, engine_pool_size(args))
+        else:
+            results = run_threads(session, urls, engine_pool_size(args))
+        for idx, title_trimmed, rows in results:
+            comps += 1
+            if title_trimmed:
+                titles.append((idx, title_trimmed))
+            else:
+                failed += 1
+            buffer.put(idx, rows)
+        if RESOLVER is not None and RESOLVER.missing:
+            with stage("names"):
+                names = resolve_missing_names(session, RESOLVER, engine_concurrency(args))
+        for rows in unnamed:
+            release(-1, fill_names(rows, names))
+        if held:
+            with stage("rank_merge"):
+                comp_rows = [fill_names(held[i], names) if names else held[i] for i in sorted(held)]
+                merged = merge_ranked(comp_rows, args.merge_policy, weights)
+                for chunk in iter(lambda: list(islice(merged, MERGE_CHUNK)), []):
+                    release(-1, chunk)
+    finally:
+        writer.close()
+        RESOLVER = None
+
+    name_counts = writer.name_counts
+    named = writer.written
+
+    report_duplicate_names(name_counts)
+    written = named
+    if args.fuzzy_dupes or args.merge_dupes:
+        with stage("fuzzy"):
+            clusters = find_clusters(name_counts, args.fuzzy_threshold)
+        print_clusters(clusters, name_counts, args.fuzzy_threshold)
+        METRICS.incr("fuzzy_clusters", len(clusters))
+        if args.merge_dupes:
+            with stage("merge"):
+                merged_name = partial_name.replace(".partial", ".merge")
+                written = write_merged(read_rows(partial_name), merge_map(clusters), merged_name)
+                os.replace(merged_name, partial_name)
+    if sink is not None:
+        if sink_deferred:
+            sink.add(list(read_rows(partial_name)))
+        sink.commit()
 
     # Keep filename behavior: prefer first non-empty title from URL list
     title_from_first = ""
@@ -291,15 +1474,191 @@ def main():
         title_from_first = titles[0][1]
         title_from_last = titles[-1][1]
 
-    chosen_title = title_from_first or title_from_last or "competition"
-    out_name = sanitize_filename(chosen_title) + ".csv"
+    return {
+        "title": title_from_first or title_from_last,
+        "comps": comps,
+        "failed_comps": failed,
+        "rows_received": writer.received,
+        "rows": written,
+        "duplicates": writer.received - named,
+        "fuzzy_merged": named - written,
+        "names_resolved": len(names),
+    }
+
+
+def resolve_missing_names(
+    session: requests.Session, resolver: NameResolver, workers: int, report: bool = True
+) -> Dict[str, str]:
+    """
+    {userId: name} for the resolver's missing ids that some source could name:
+    this run's athlete lists, then the athlete store, then the profile endpoint.
+    """
+    store = ATHLETE_STORE
+    found = resolver.resolve(
+        store.lookup if store is not None else None,
+        (lambda user_id: fetch_profile_name(session, user_id)) if PROFILE_PATH else None,
+        workers,
+    )
+    if store is not None and found:
+        store.upsert(found)
+    sources = resolver.sources
+    if report:
+        print(
+            f"[NAMES] {len(found)}/{len(resolver.missing)} missing name(s) resolved "
+            f"({sources['run']} from this run's athlete lists, {sources['store']} from the athlete store, "
+            f"{sources['profile']} from profiles)"
+        )
+    if METRICS is not None:
+        METRICS.incr("names_resolved", len(found))
+    return found
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Events of a batch manifest (JSON): a list, or {"events": [...]}. Each event
+    has an optional "name" and its comps as "compIds" and/or comp page "urls",
+    or an "eventId" to discover them.
+    """
+    with open(path, encoding="utf-8") as f:
+        obj = json.load(f)
+    events = obj.get("events") if isinstance(obj, dict) else obj
+    if not isinstance(events, list) or not all(isinstance(ev, dict) for ev in events):
+        raise ValueError(f"{path}: expected a list of events or {{\"events\": [...]}}")
+    for i, ev in enumerate(events):
+        if not (ev.get("compIds") or ev.get("urls") or ev.get("eventId")):
+            raise ValueError(f"{path}: event #{i + 1} has no compIds, urls or eventId")
+    return events
 
-    write_csv(out_name, unique_rows)
+
+# Per-process state of a batch worker (set by _batch_init).
+_BATCH_ARGS: Optional[argparse.Namespace] = None
+_BATCH_SESSION: Optional[requests.Session] = None
+
+
+def _batch_init(args: argparse.Namespace, rate_share: float) -> None:
+    global _BATCH_ARGS, _BATCH_SESSION
+    configure(args, rate_share)
+    _BATCH_ARGS = args
+    _BATCH_SESSION = make_session(engine_pool_size(args))
+
+
+def _batch_event(idx: int, event: Dict[str, Any], out_dir: str) -> Dict[str, Any]:
+    """
+    One manifest event in a worker process. Its console output goes to
+    <out_dir>/.event-<n>.log so concurrent events do not interleave.
+    """
+    global METRICS
+    args, session = _BATCH_ARGS, _BATCH_SESSION
+    METRICS = Metrics()
+    urls: Iterable[str] = list(event.get("urls") or []) + [
+        COMP_PAGE_URL.format(cid) for cid in event.get("compIds") or []
+    ]
+    partial_name = os.path.join(out_dir, f".event-{idx + 1}.partial{output_ext(args)}")
+    log_name = os.path.join(out_dir, f".event-{idx + 1}.log")
+    started = time.perf_counter()
+    with open(log_name, "w", encoding="utf-8") as log, redirect_stdout(log):
+        # Journals are keyed by manifest position, so --resume expects the same manifest.
+        open_journal(args, os.path.join(out_dir, f".event-{idx + 1}.journal.ndjson"))
+        open_results_store(args)
+        summary = None
+        try:
+            if not urls:
+                listing = API_BASE + DISCOVERY_LISTINGS["event"].format(id=event["eventId"])
+                urls = discover_urls(session, listing, args)
+            summary = scrape_event(session, urls, args, partial_name)
+        finally:
+            close_journal()
+            close_results_store(
+                sanitize_filename(event.get("name") or summary["title"] or f"event-{idx + 1}") if summary else None
+            )
+            if summary is None and os.path.exists(partial_name):
+                os.remove(partial_name)
+    requests_made = METRICS.summary()["endpoints"]
+    summary.update(
+        index=idx,
+        name=event.get("name") or summary["title"],
+        partial=partial_name,
+        log=log_name,
+        seconds=round(time.perf_counter() - started, 3),
+        requests=sum(e["calls"] for e in requests_made.values()),
+        request_errors=sum(e["errors"] for e in requests_made.values()),
+        pid=os.getpid(),
+    )
+    return summary
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    """
+    Scrape every manifest event in a process pool (own engine, session, cache
+    handle and limiter per process) into one file per event plus index.json.
+    """
+    if args.firestore_exercise or args.watch or args.snapshot_out or args.serve:
+        raise SystemExit("--manifest cannot be combined with --firestore-exercise, --watch, --snapshot-out or --serve")
+    events = load_manifest(args.manifest)
+    os.makedirs(args.out_dir, exist_ok=True)
+    workers = max(1, min(args.batch_workers, len(events)))
+    ext = output_ext(args)
+    started = time.time()
+    t0 = time.perf_counter()
+    print(f"[BATCH] {len(events)} event(s) on {workers} process(es) -> {args.out_dir}")
+
+    summaries: List[Dict[str, Any]] = []
+    used: Set[str] = set()
+    # Every process gets an equal share of --rate so the batch as a whole stays under it.
+    with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init, initargs=(args, 1.0 / workers)) as ex:
+        futures = {ex.submit(_batch_event, i, ev, args.out_dir): i for i, ev in enumerate(events)}
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            try:
+                summary = fut.result()
+            except Exception as e:
+                print(f"[ERR] event #{idx + 1} -> {e}")
+                summaries.append({"index": idx, "name": events[idx].get("name") or "", "error": str(e)})
+                continue
+            base = sanitize_filename(summary["name"] or f"event-{idx + 1}")
+            out_name = base + ext if base + ext not in used else f"{base}-{idx + 1}{ext}"
+            used.add(out_name)
+            os.replace(summary.pop("partial"), os.path.join(args.out_dir, out_name))
+            log_name = os.path.join(args.out_dir, os.path.splitext(out_name)[0] + ".log")
+            os.replace(summary.pop("log"), log_name)
+            summary.update(file=out_name, log=os.path.basename(log_name))
+            summaries.append(summary)
+            print(
+                f"[EVENT] {out_name}: {summary['rows']} rows from {summary['comps']} comp(s) "
+                f"({summary['failed_comps']} failed) in {summary['seconds']:.1f}s"
+            )
+
+    summaries.sort(key=lambda s: s["index"])
+    index = {
+        "manifest": os.path.abspath(args.manifest),
+        "started": started,
+        "wall_seconds": round(time.perf_counter() - t0, 3),
+        "workers": workers,
+        "events": summaries,
+    }
+    index_name = os.path.join(args.out_dir, "index.json")
+    with open(index_name, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    failed = sum(1 for s in summaries if "error" in s or s["failed_comps"])
     print(
-        f"\nSaved -> {out_name} with {len(unique_rows)} rows "
-        f"(removed {len(all_rows) - len(unique_rows)} duplicates)"
+        f"\nBatch took {index['wall_seconds']:.2f}s: {len(summaries)} event(s), "
+        f"{sum(s.get('rows', 0) for s in summaries)} rows, {failed} with failures -> {index_name}"
     )
 
 
+def write_reports(args: argparse.Namespace, summary: Dict[str, Any]) -> None:
+    if METRICS is None:
+        return
+    METRICS.incr("rows_received", summary["rows_received"])
+    METRICS.incr("rows_written", summary["rows"])
+    METRICS.print_summary()
+    if args.report:
+        METRICS.write_json(args.report)
+        print(f"Report -> {args.report}")
+    if args.prom:
+        METRICS.write_prometheus(args.prom)
+        print(f"Prometheus -> {args.prom}")
+
+
 if __name__ == "__main__":
     main()
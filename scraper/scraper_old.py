@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
+import argparse
 import csv
+import queue
 import re
+import threading
 import time
 import random
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Tuple, Optional
+from typing import Callable, Iterator, List, Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from selenium import webdriver
@@ -29,6 +33,7 @@ MAX_WORKERS = 1          # start with 1 for stability; bump to 2 if solid
 MAX_RETRIES = 3
 PAGE_TIMEOUT = 60        # seconds
 JITTER_RANGE = (0.05, 0.4)
+DRIVER_MAX_USES = 25     # pages per pooled browser before it is restarted (Chrome leaks memory)
 
 
 # --------------------
@@ -72,6 +77,79 @@ def get_driver() -> webdriver.Chrome:
     return driver
 
 
+class DriverPool:
+    """
+    Long-lived headless browsers shared by the workers. A driver goes back to the
+    pool after a successful page and is reused for the next URL; one that failed
+    (unknown state) or served DRIVER_MAX_USES pages is quit and replaced lazily.
+    """
+
+    def __init__(self, size: int, max_uses: int = DRIVER_MAX_USES) -> None:
+        self.size = size
+        self.max_uses = max_uses
+        self.started = 0
+        self._idle: "queue.Queue[Tuple[webdriver.Chrome, int]]" = queue.Queue()
+        self._live = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        driver, uses = self._acquire()
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            if healthy and uses + 1 < self.max_uses:
+                try:
+                    # Drop the old page (and its timers / sockets) but keep cookies.
+                    driver.get("about:blank")
+                    self._idle.put((driver, uses + 1))
+                    return
+                except Exception:
+                    pass
+            self._discard(driver)
+
+    def _acquire(self) -> Tuple[webdriver.Chrome, int]:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._live < self.size:
+                    self._live += 1
+                    self.started += 1
+                    break
+            # All browsers busy: wait for one back (or for a discarded one's slot).
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                pass
+        try:
+            return get_driver(), 0
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        with self._lock:
+            self._live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
 # --------------------
 # Helpers
 # --------------------
@@ -106,11 +184,14 @@ def autoscroll(driver: webdriver.Chrome, pause: float = 0.4, max_rounds: int = 8
     last_h = driver.execute_script("return document.body.scrollHeight")
     for _ in range(max_rounds):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(pause)
-        new_h = driver.execute_script("return document.body.scrollHeight")
-        if new_h == last_h:
+        # Continue as soon as more content renders; `pause` only bounds the wait.
+        try:
+            WebDriverWait(driver, pause, poll_frequency=0.05).until(
+                lambda d: d.execute_script("return document.body.scrollHeight") != last_h
+            )
+        except TimeoutException:
             break
-        last_h = new_h
+        last_h = driver.execute_script("return document.body.scrollHeight")
 
 
 def raw_title(driver: webdriver.Chrome) -> str:
@@ -197,10 +278,9 @@ def save_artifacts(driver: webdriver.Chrome, label: str) -> None:
 # --------------------
 # Scraping core
 # --------------------
-def scrape_once(url: str) -> Tuple[str, List[Tuple[str, str]]]:
+def scrape_once(url: str, driver: webdriver.Chrome) -> Tuple[str, List[Tuple[str, str]]]:
     print(f"[DEBUG] start {url}")
     rows: List[Tuple[str, str]] = []
-    driver = get_driver()
     try:
         driver.get(url)
         wait_for_page_ready(driver, timeout=PAGE_TIMEOUT)
@@ -245,19 +325,37 @@ def scrape_once(url: str) -> Tuple[str, List[Tuple[str, str]]]:
         # Save artifacts for debugging what actually loaded
         save_artifacts(driver, "scrape_once")
         raise e
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
 
 
-def scrape_one(url: str) -> Tuple[str, List[Tuple[str, str]]]:
+ApiScrape = Callable[[str], Tuple[str, List[Tuple[str, str]]]]
+
+
+def make_api_scrape() -> ApiScrape:
+    """
+    JSON API path of scraper.py (meta + protocol + athletes), no browser needed.
+    Returns ("", []) when the API fails for a comp.
+    """
+    import scraper as api
+
+    session = api.make_session(MAX_WORKERS)
+    return lambda url: api.scrape_one(session, url)
+
+
+def scrape_one(
+    url: str, pool: DriverPool, api_scrape: Optional[ApiScrape] = None
+) -> Tuple[str, List[Tuple[str, str]]]:
+    if api_scrape is not None:
+        comp_title, rows = api_scrape(url)
+        if comp_title:
+            return comp_title, rows
+        print(f"[FALLBACK] {url} -> API failed, extracting from the page")
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             # small jitter before each attempt
             time.sleep(random.uniform(*JITTER_RANGE))
-            return scrape_once(url)
+            with pool.driver() as driver:
+                return scrape_once(url, driver)
         except (WebDriverException, TimeoutException, Exception) as e:
             if attempt == MAX_RETRIES:
                 print(f"[ERR] {url} -> {e!r}")
@@ -281,28 +379,49 @@ def write_csv(filename: str, rows: List[Tuple[str, str]]) -> None:
 # Main
 # --------------------
 def main():
+    global MAX_WORKERS
+    p = argparse.ArgumentParser(description="Scrape competitor names from allstrongman comp pages.")
+    p.add_argument(
+        "--hybrid",
+        action="store_true",
+        help="use the JSON API first; open the page only for comps where the API fails",
+    )
+    p.add_argument("--workers", type=int, default=MAX_WORKERS, help="parallel URLs = pooled browsers")
+    p.add_argument(
+        "--max-uses", type=int, default=DRIVER_MAX_USES, help="pages per browser before it is restarted"
+    )
+    args = p.parse_args()
+    MAX_WORKERS = args.workers
+
     titles: List[Tuple[int, str]] = []
     all_rows: List[Tuple[str, str]] = []
     failed: List[str] = []
+    # Browsers start on first use, so a hybrid run the API fully covers never launches one.
+    pool = DriverPool(MAX_WORKERS, args.max_uses)
+    api_scrape = make_api_scrape() if args.hybrid else None
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        futures = {ex.submit(scrape_one, url): idx for idx, url in enumerate(URLS)}
-        for fut in as_completed(futures):
-            idx = futures[fut]
-            comp_title, rows = fut.result()
-            if comp_title:
-                titles.append((idx, comp_title))
-            else:
-                failed.append(URLS[idx])
-            all_rows.extend(rows)
-
-    # Re-try any failures once, sequentially
-    for url in failed[:]:
-        ct, rows = scrape_one(url)
-        if ct:
-            titles.append((URLS.index(url), ct))
-            all_rows.extend(rows)
-            failed.remove(url)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            futures = {ex.submit(scrape_one, url, pool, api_scrape): idx for idx, url in enumerate(URLS)}
+            for fut in as_completed(futures):
+                idx = futures[fut]
+                comp_title, rows = fut.result()
+                if comp_title:
+                    titles.append((idx, comp_title))
+                else:
+                    failed.append(URLS[idx])
+                all_rows.extend(rows)
+
+        # Re-try any failures once, sequentially
+        for url in failed[:]:
+            ct, rows = scrape_one(url, pool, api_scrape)
+            if ct:
+                titles.append((URLS.index(url), ct))
+                all_rows.extend(rows)
+                failed.remove(url)
+    finally:
+        pool.close()
+    print(f"[DEBUG] {pool.started} browser(s) started for {len(URLS)} URL(s)")
 
     titles.sort(key=lambda x: x[0])
     chosen_title = (titles[0][1] if titles else "competition")
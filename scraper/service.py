@@ -0,0 +1,261 @@
+"""
+Daemon mode: a small local HTTP API in front of a warm scraper.
+
+  GET /protocols/{compId}  -> JSON: title, category and athletes in rank order
+  GET /events/{id}.csv     -> the event's (name, category) CSV, deduped, listing order
+  GET /health              -> cache counters
+
+Competitions and event listings live in memory. A fresh entry is served
+as-is; a stale one is served at once while a single background refresh
+replaces it (stale-while-revalidate); a missing one is loaded, and
+concurrent requests for the same key wait on that one load instead of
+starting their own. ?refresh=1 skips the cached copy (still coalesced).
+A comp refresh re-fetches only its protocol: meta and the user map of the
+previous snapshot are reused while they still cover every athlete. Event
+CSVs get missing names resolved the way a CLI run does.
+"""
+import csv
+import io
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Generic, List, NamedTuple, Optional, Tuple, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+from models import ProtocolEntry
+from name_resolver import fill_names
+
+V = TypeVar("V")
+
+MAX_ENTRIES = 4096
+
+
+class CompSnapshot(NamedTuple):
+    comp_id: str
+    title: str
+    category: str
+    # in rank order
+    protocol: List[ProtocolEntry]
+    user_map: Dict[str, str]
+    rows: List[Tuple[str, str]]
+    fetched_at: float
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("value", "loaded_at")
+
+    def __init__(self, value: V, loaded_at: float) -> None:
+        self.value = value
+        self.loaded_at = loaded_at
+
+
+class SharedCache(Generic[V]):
+    """
+    Per-key stale-while-revalidate cache with request coalescing.
+    `load(key, previous)` gets the last value (or None) to refresh from.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str, Optional[V]], V],
+        ttl: float,
+        refresher: Executor,
+        max_entries: int = MAX_ENTRIES,
+    ) -> None:
+        self._load_fn = load
+        self.ttl = ttl
+        self._refresher = refresher
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry[V]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self.counts = {"hit": 0, "stale": 0, "miss": 0, "shared": 0, "refresh": 0, "error": 0}
+
+    def get(self, key: str, force: bool = False) -> Tuple[V, str]:
+        """
+        (value, how): how is hit, stale, miss (loaded here) or shared (joined a load).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not force:
+                self._entries.move_to_end(key)
+                if time.monotonic() - entry.loaded_at <= self.ttl:
+                    self.counts["hit"] += 1
+                    return entry.value, "hit"
+                if key not in self._inflight:
+                    fut: Future = Future()
+                    self._inflight[key] = fut
+                    self.counts["refresh"] += 1
+                    self._refresher.submit(self._load, key, entry.value, fut)
+                self.counts["stale"] += 1
+                return entry.value, "stale"
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+            self.counts["miss" if owner else "shared"] += 1
+        if owner:
+            self._load(key, entry.value if entry is not None else None, fut)
+        return fut.result(), "miss" if owner else "shared"
+
+    def _load(self, key: str, previous: Optional[V], fut: Future) -> None:
+        try:
+            value = self._load_fn(key, previous)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.counts["error"] += 1
+            fut.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class ScraperService:
+    def __init__(
+        self,
+        load_comp: Callable[[str, Optional[CompSnapshot]], CompSnapshot],
+        event_comp_ids: Callable[[str], List[str]],
+        comp_ttl: float,
+        event_ttl: float,
+        workers: int = 6,
+        resolve_names: Optional[Callable[[List[CompSnapshot]], Dict[str, str]]] = None,
+    ) -> None:
+        """
+        `load_comp(comp_id, previous)` scrapes one competition; `event_comp_ids(id)`
+        lists an event's compIds in listing order; `resolve_names(snaps)` returns
+        {userId: name} for the athletes the snapshots have no name for.
+        """
+        self._resolve_names = resolve_names
+        # Background refreshes and the per-event fan-out use separate pools so a
+        # burst of event requests cannot starve refreshes (or the other way round).
+        self._refresher = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh")
+        self._fanout = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+        self.comps: SharedCache[CompSnapshot] = SharedCache(load_comp, comp_ttl, self._refresher)
+        self.events: SharedCache[List[str]] = SharedCache(
+            lambda event_id, _previous: event_comp_ids(event_id), event_ttl, self._refresher
+        )
+        self.started = time.time()
+
+    def protocol(self, comp_id: str, force: bool = False) -> Tuple[Dict[str, Any], str]:
+        snap, how = self.comps.get(comp_id, force)
+        return {
+            "compId": snap.comp_id,
+            "title": snap.title,
+            "category": snap.category,
+            "fetchedAt": snap.fetched_at,
+            "athletes": [
+                {"rank": entry.rank, "userId": entry.user_id, "name": row[0]}
+                for entry, row in zip(snap.protocol, snap.rows)
+            ],
+        }, how
+
+    def event_rows(self, event_id: str, force: bool = False) -> Tuple[List[Tuple[str, str]], int, str]:
+        """
+        (deduped rows, failed comps, how the listing was served) for one event.
+        """
+        comp_ids, how = self.events.get(event_id, force)
+
+        def one(comp_id: str) -> Optional[CompSnapshot]:
+            try:
+                return self.comps.get(comp_id, force)[0]
+            except Exception as e:
+                print(f"[ERR] serve compId={comp_id} -> {e}", file=sys.stderr)
+                return None
+
+        snaps = list(self._fanout.map(one, comp_ids))
+        loaded = [s for s in snaps if s is not None]
+        names = self._resolve_names(loaded) if self._resolve_names is not None else {}
+        seen = set()
+        rows: List[Tuple[str, str]] = []
+        for snap in loaded:
+            for row in fill_names(snap.rows, names) if names else snap.rows:
+                if row not in seen:
+                    seen.add(row)
+                    rows.append(row)
+        return rows, sum(1 for s in snaps if s is None), how
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "uptime": round(time.time() - self.started, 1),
+            "comps": dict(self.comps.counts, entries=len(self.comps)),
+            "events": dict(self.events.counts, entries=len(self.events)),
+        }
+
+    def close(self) -> None:
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+        self._fanout.shutdown(wait=False, cancel_futures=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service: ScraperService
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8", headers)
+
+    def do_GET(self) -> None:
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        force = parse_qs(url.query).get("refresh", ["0"])[0] not in ("", "0")
+        parts = [p for p in url.path.split("/") if p]
+        status, how = 200, ""
+        try:
+            if parts == ["health"]:
+                self._json(200, self.service.health())
+            elif len(parts) == 2 and parts[0] == "protocols":
+                obj, how = self.service.protocol(parts[1], force)
+                self._json(200, obj, {"X-Cache": how})
+            elif len(parts) == 2 and parts[0] == "events" and parts[1].endswith(".csv"):
+                rows, failed, how = self.service.event_rows(parts[1][: -len(".csv")], force)
+                buf = io.StringIO()
+                w = csv.writer(buf)
+                w.writerow(["name", "category"])
+                w.writerows(rows)
+                self._send(
+                    200,
+                    buf.getvalue().encode("utf-8"),
+                    "text/csv; charset=utf-8",
+                    {"X-Cache": how, "X-Failed-Comps": str(failed)},
+                )
+            else:
+                status = 404
+                self._json(404, {"message": "Not Found"})
+        except Exception as e:
+            status = 502
+            self._json(502, {"message": str(e)})
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[SERVE] {self.command} {self.path} -> {status}{' ' + how if how else ''} {elapsed:.1f}ms")
+
+
+def make_server(service: ScraperService, host: str, port: int) -> ThreadingHTTPServer:
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,164 @@
+"""
+Portable snapshot bundle: every API response of a run packed into one file.
+
+Layout (little-endian):
+  header   "WMLSNAP1", u32 entries, u64 index offset, u64 meta offset, u32 meta size
+  records  u32 url size, u32 stored size, u32 raw size, url, zlib(body); back to back
+  meta     JSON: api_base, created, entries
+  index    entries x (16-byte blake2b(url), u64 record offset), sorted by key
+
+SnapshotReader mmaps the file and binary-searches the index, so a lookup
+touches a few pages and inflates one body; nothing is read up front. The
+stored URL is compared on every hit. A URL fetched twice keeps its last body.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"WMLSNAP1"
+_HEADER = struct.Struct("<8sIQQI")
+_RECORD = struct.Struct("<III")
+_ENTRY = struct.Struct("<16sQ")
+_OBJECT_ID = re.compile(r"/[0-9a-fA-F]{24}(?=/|$)")
+
+
+class SnapshotMiss(LookupError):
+    pass
+
+
+def url_key(url: str) -> bytes:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+class SnapshotWriter:
+    def __init__(self, path: str, api_base: str) -> None:
+        self.path = path
+        self.api_base = api_base
+        self._tmp = path + ".tmp"
+        self._lock = threading.Lock()
+        self._f = open(self._tmp, "wb")
+        self._f.write(_HEADER.pack(MAGIC, 0, 0, 0, 0))
+        self._index: Dict[bytes, int] = {}
+        self.raw_bytes = 0
+
+    def add(self, url: str, body: bytes) -> None:
+        url_b = url.encode("utf-8")
+        packed = zlib.compress(body, 6)
+        with self._lock:
+            offset = self._f.tell()
+            self._f.write(_RECORD.pack(len(url_b), len(packed), len(body)))
+            self._f.write(url_b)
+            self._f.write(packed)
+            self._index[url_key(url)] = offset
+            self.raw_bytes += len(body)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> int:
+        """
+        Write meta and index, then move the file into place. Returns its size.
+        """
+        with self._lock:
+            meta = json.dumps(
+                {"api_base": self.api_base, "created": time.time(), "entries": len(self._index)}
+            ).encode("utf-8")
+            meta_offset = self._f.tell()
+            self._f.write(meta)
+            index_offset = self._f.tell()
+            for key in sorted(self._index):
+                self._f.write(_ENTRY.pack(key, self._index[key]))
+            size = self._f.tell()
+            self._f.seek(0)
+            self._f.write(_HEADER.pack(MAGIC, len(self._index), index_offset, meta_offset, len(meta)))
+            self._f.close()
+        os.replace(self._tmp, self.path)
+        return size
+
+
+class SnapshotReader:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.entries, self._index, meta_offset, meta_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot bundle")
+        self.meta: Dict[str, Any] = json.loads(self._mm[meta_offset:meta_offset + meta_size])
+        self.api_base: str = self.meta.get("api_base", "")
+
+    def _find(self, key: bytes) -> Optional[int]:
+        lo, hi = 0, self.entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, offset = _ENTRY.unpack_from(self._mm, self._index + mid * _ENTRY.size)
+            if k == key:
+                return offset
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _record(self, offset: int) -> Tuple[str, bytes, int]:
+        url_size, stored, raw = _RECORD.unpack_from(self._mm, offset)
+        start = offset + _RECORD.size
+        url = self._mm[start:start + url_size].decode("utf-8")
+        return url, self._mm[start + url_size:start + url_size + stored], raw
+
+    def get(self, url: str) -> bytes:
+        offset = self._find(url_key(url))
+        if offset is not None:
+            stored_url, packed, _ = self._record(offset)
+            if stored_url == url:
+                return zlib.decompress(packed)
+        raise SnapshotMiss(f"not in snapshot {self.path}: {url}")
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        (url, stored size, raw size) of every entry, in index order.
+        """
+        for i in range(self.entries):
+            _, offset = _ENTRY.unpack_from(self._mm, self._index + i * _ENTRY.size)
+            url, packed, raw = self._record(offset)
+            yield url, len(packed), raw
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Show what a snapshot bundle contains.")
+    p.add_argument("path", help="bundle written with scraper.py --snapshot-out")
+    p.add_argument("--urls", action="store_true", help="list every URL")
+    args = p.parse_args(argv)
+
+    reader = SnapshotReader(args.path)
+    stored = raw = 0
+    endpoints: Counter = Counter()
+    for url, packed, size in reader:
+        stored += packed
+        raw += size
+        path = url[len(reader.api_base):] if url.startswith(reader.api_base) else url
+        endpoints[_OBJECT_ID.sub("/{id}", path.split("?")[0])] += 1
+        if args.urls:
+            print(url)
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(reader.meta.get("created", 0)))
+    print(f"{args.path}: {reader.entries} responses from {reader.api_base}, created {created}")
+    print(f"  {raw / 1e6:.2f} MB of bodies stored in {stored / 1e6:.2f} MB")
+    for name, n in endpoints.most_common():
+        print(f"  {name}: {n}")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper modules are flat siblings run as scripts, not a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+import types
+
+from firestore_sink import FirestoreSink
+
+SDK = types.SimpleNamespace(SERVER_TIMESTAMP="<now>")
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def set(self, doc_id, data, merge=False):
+        self.ops.append((doc_id, data, merge))
+
+    def commit(self):
+        if self.client.fail_batches:
+            self.client.fail_batches -= 1
+            raise RuntimeError("unavailable")
+        for doc_id, data, merge in self.ops:
+            self.client.docs[doc_id] = {**self.client.docs.get(doc_id, {}), **data} if merge else dict(data)
+
+
+class FakeCollection:
+    def __init__(self, client):
+        self.client = client
+
+    def document(self, doc_id):
+        return doc_id
+
+    def list_documents(self):
+        return [types.SimpleNamespace(id=doc_id) for doc_id in self.client.docs]
+
+
+class FakeClient:
+    def __init__(self):
+        self.docs = {}
+        self.fail_batches = 0
+
+    def collection(self, *path):
+        return FakeCollection(self)
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+def import_rows(client, rows, batch_size=500):
+    sink = FirestoreSink("ex1", client=client, sdk=SDK, batch_size=batch_size, workers=1)
+    sink.add(rows)
+    return sink, sink.commit()
+
+
+def by_name(client):
+    return {d["name"]: d for d in client.docs.values()}
+
+
+def test_reimport_keeps_live_fields_and_follows_athletes():
+    client = FakeClient()
+    import_rows(client, [("Ann", "n1"), ("Bob", "h1")])
+    docs = by_name(client)
+    assert docs["Ann"]["createdAt"] == "<now>" and docs["Ann"]["orderRank"] == 0
+    docs["Ann"].update(status="lifting", lane=2)
+
+    _, written = import_rows(client, [("Bob", "h1"), ("ann", "N1"), ("Cid", "w1")])
+    assert written == 3
+    docs = by_name(client)
+    assert len(client.docs) == 3
+    # Ann's document is the same one, renamed to the new spelling, with her lane kept.
+    assert docs["ann"]["status"] == "lifting" and docs["ann"]["lane"] == 2 and docs["ann"]["orderRank"] == 1
+    assert docs["Bob"]["orderRank"] == 0 and docs["Cid"]["status"] == "waiting"
+
+
+def test_foreign_documents_abort_the_import():
+    client = FakeClient()
+    client.docs["AutoId123"] = {"name": "Zed", "category": "n1"}
+    _, written = import_rows(client, [("Ann", "n1")])
+    assert written == 0 and list(client.docs) == ["AutoId123"]
+
+    # A previous import of a longer list counts as foreign too.
+    client = FakeClient()
+    import_rows(client, [("Ann", "n1"), ("Bob", "h1")])
+    _, written = import_rows(client, [("Ann", "n1")])
+    assert written == 0 and len(client.docs) == 2
+
+
+def test_failed_batch_is_reported_and_rerun_completes():
+    client = FakeClient()
+    client.fail_batches = 1
+    rows = [(f"A{i}", "n1") for i in range(5)]
+    sink, written = import_rows(client, rows, batch_size=2)
+    assert written == 3 and sink.failed == [(0, 1, "unavailable")]
+
+    _, written = import_rows(client, rows, batch_size=2)
+    assert written == 5 and sorted(d["orderRank"] for d in client.docs.values()) == [0, 1, 2, 3, 4]
+
+
+def test_duplicate_competitor_is_invalid():
+    client = FakeClient()
+    sink, written = import_rows(client, [("Ann  Lee", "n1"), ("ann lee", "N 1")])
+    assert written == 0 and sink.invalid == [(3, "Duplicate competitor", "ann lee")]
@@ -0,0 +1,40 @@
+from collections import Counter
+
+from fuzzy_dupes import find_clusters, merge_map, name_key, similarity
+
+
+def counts(**names):
+    return {name.replace("_", " "): Counter({"n1": n}) for name, n in names.items()}
+
+
+def test_spelling_variants_cluster():
+    name_counts = {"Сергій Бондар": Counter({"n1": 3}), "Serhii Bondar": Counter({"n1": 1}),
+                   "bondar  serhii": Counter({"h1": 1})}
+    [cluster] = find_clusters(name_counts)
+    assert cluster.canonical == "Сергій Бондар"
+    assert merge_map([cluster]) == {"Serhii Bondar": "Сергій Бондар", "bondar  serhii": "Сергій Бондар"}
+
+
+def test_gender_variants_stay_apart():
+    assert find_clusters(counts(Oleksandr_Ivanov=1, Oleksandra_Ivanova=1)) == []
+
+
+def test_chain_is_not_merged_transitively():
+    a, b, c = "Taras Melnichuk", "Taras Melnyk", "Taras Melnykov"
+    ka, kb, kc = name_key(a), name_key(b), name_key(c)
+    assert similarity(ka, kb) >= 0.9 and similarity(kb, kc) >= 0.9 and similarity(ka, kc) < 0.9
+
+    name_counts = {a: Counter({"n1": 3}), b: Counter({"n1": 2}), c: Counter({"n1": 1})}
+    clusters = find_clusters(name_counts, 0.9)
+    # Melnykov only matches Melnyk, which already belongs to Melnichuk's cluster.
+    assert [[name for name, _ in cl.members] for cl in clusters] == [[a, b]]
+    assert merge_map(clusters) == {b: a}
+    assert all(score >= 0.9 for cl in clusters for _, score in cl.members)
+
+
+def test_chain_through_the_canonical_name_is_kept():
+    a, b, c = "Taras Melnichuk", "Taras Melnyk", "Taras Melnykov"
+    name_counts = {a: Counter({"n1": 1}), b: Counter({"n1": 5}), c: Counter({"n1": 1})}
+    [cluster] = find_clusters(name_counts, 0.9)
+    assert cluster.canonical == b and {name for name, _ in cluster.members} == {a, b, c}
+    assert cluster.min_score >= 0.9
@@ -0,0 +1,52 @@
+import time
+
+from hedging import MIN_DELAY, Cancelled, Hedger, LatencyTracker
+
+
+def make_attempt(primary_seconds, hedge_seconds):
+    calls = []
+
+    def attempt(handle):
+        slow = not calls
+        calls.append(handle)
+        handle.sent()
+        deadline = time.monotonic() + (primary_seconds if slow else hedge_seconds)
+        while time.monotonic() < deadline:
+            if handle.cancelled:
+                raise Cancelled("lost")
+            time.sleep(0.002)
+        return "primary" if slow else "hedge"
+
+    return attempt
+
+
+def test_no_hedge_until_enough_samples():
+    hedger = Hedger()
+    assert hedger.run("protocol", make_attempt(0.0, 0.0)) == ("primary", "primary")
+    assert hedger.counts["hedged"] == 0
+
+
+def test_hedge_wins_against_slow_primary():
+    hedger = Hedger(ratio=1.0, min_hedges=50)
+    hedger.latency = LatencyTracker(90.0, window=20, min_samples=5)
+    for _ in range(5):
+        hedger.latency.record("protocol", 0.03)
+    assert hedger.run("protocol", make_attempt(1.0, 0.0)) == ("hedge", "hedge")
+    assert hedger.counts["hedge_won"] == 1
+
+
+def test_delay_stays_put_when_every_primary_is_slow():
+    hedger = Hedger(ratio=1.0, min_hedges=100)
+    hedger.latency = LatencyTracker(90.0, window=20, min_samples=10)
+    for _ in range(20):
+        hedger.latency.record("protocol", 0.06)
+    before = hedger.latency.delay("protocol")
+
+    for _ in range(30):
+        # Primaries take far longer than the hedge delay; every duplicate answers at once.
+        assert hedger.run("protocol", make_attempt(0.5, 0.0))[1] == "hedge"
+
+    # The lost primaries count with the time they had taken, so the fast duplicates
+    # cannot pull the percentile down to the floor.
+    after = hedger.latency.delay("protocol")
+    assert after >= 0.9 * before > MIN_DELAY
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import scraper
+from http_cache import ResponseCache
+
+COMP = "0123456789abcdef01234567"
+ATHLETES_URL = f"{scraper.API_BASE}/competitions/{COMP}/athletes"
+
+
+class FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.status_code = 200
+        self.headers = {"Content-Length": str(len(body)), "ETag": '"v1"'}
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        return (self._body[i:i + size] for i in range(0, len(self._body), size))
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.calls = 0
+
+    def get(self, url, timeout=None, headers=None, stream=False):
+        self.calls += 1
+        return FakeResponse(url, self.body)
+
+
+@pytest.fixture
+def backends(tmp_path, monkeypatch):
+    """
+    Default configuration (response cache on, --json-backend auto); records the backend of every parse.
+    """
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), 64 * 1024 * 1024)
+    for name, value in [("RESPONSE_CACHE", cache), ("SNAPSHOT", None), ("SNAPSHOT_WRITER", None),
+                        ("LIMITER", None), ("HEDGER", None), ("METRICS", None), ("JSON_BACKEND", None)]:
+        monkeypatch.setattr(scraper, name, value)
+    seen = []
+    real = scraper.iter_records
+
+    def spy(chunks, array_keys, fields, backend=None):
+        seen.append(backend)
+        return real(chunks, array_keys, fields, backend)
+
+    monkeypatch.setattr(scraper, "iter_records", spy)
+    yield seen
+    cache.close()
+
+
+def athletes_body(n):
+    data = [{"userId": f"u{i}", "name": f"Athlete {i}", "bio": "x" * 200, "results": [{"v": i}]} for i in range(n)]
+    return json.dumps({"data": data}).encode()
+
+
+def test_large_cached_body_is_streamed(backends, monkeypatch):
+    body = athletes_body(50)
+    monkeypatch.setattr(scraper, "STREAM_MIN_BYTES", len(body) // 2)
+    session = FakeSession(body)
+    expected = [{"userId": f"u{i}", "name": f"Athlete {i}"} for i in range(50)]
+
+    assert scraper.http_get_records(session, ATHLETES_URL, ("data",), scraper.ATHLETE_FIELDS) == expected
+    # The raw bytes still went into the cache ...
+    assert scraper.RESPONSE_CACHE.get(ATHLETES_URL, 600).body == body
+    # ... and the fresh cache hit streams as well.
+    assert scraper.http_get_records(session, ATHLETES_URL, ("data",), scraper.ATHLETE_FIELDS) == expected
+    assert session.calls == 1
+    assert backends == [None, None]
+
+
+def test_small_body_uses_json_loads(backends):
+    session = FakeSession(athletes_body(3))
+    scraper.http_get_records(session, ATHLETES_URL, ("data",), scraper.ATHLETE_FIELDS)
+    scraper.http_get_records(session, ATHLETES_URL, ("data",), scraper.ATHLETE_FIELDS)
+    assert backends == ["full", "full"]
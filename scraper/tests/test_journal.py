@@ -0,0 +1,110 @@
+import json
+
+import journal
+from journal import Journal
+from models import ProtocolEntry
+
+PROTOCOL = [ProtocolEntry("u1", 1), ProtocolEntry("u2", 2)]
+FULL = [ProtocolEntry("u1", 1, 10.5, [{"discipline": "log", "value": 100}])]
+
+
+def test_every_record_is_fsynced(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(journal.os, "fsync", lambda fd: synced.append(fd))
+    j = Journal(str(tmp_path / "j.ndjson"))
+    j.record("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {"u1": "Ann"})
+    j.record_failure("c2", "HTTP 500")
+    assert len(synced) == 2
+    # Already on disk before close.
+    assert len((tmp_path / "j.ndjson").read_text(encoding="utf-8").splitlines()) == 2
+    j.close()
+
+
+def test_resume_restores_entries_and_failures(tmp_path):
+    path = str(tmp_path / "j.ndjson")
+    j = Journal(path)
+    j.record("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {"u1": "Ann", "u9": "Not in protocol"})
+    j.record("c2", "Cup", "h1", "2024-05-01", FULL, {})
+    j.record_failure("c3", "timeout")
+    j.close()
+
+    r = Journal(path, resume=True)
+    assert len(r) == 2
+    assert r.get("c1") == ("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {"u1": "Ann"})
+    assert r.get("c2").protocol == FULL
+    assert r.failed == {"c3": "timeout"}
+    assert r.skipped_lines == 0
+    r.close()
+
+
+def test_latest_record_per_comp_wins(tmp_path):
+    path = str(tmp_path / "j.ndjson")
+    j = Journal(path)
+    j.record_failure("c1", "timeout")
+    j.record("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    j.record("c2", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    j.record_failure("c2", "HTTP 502")
+    j.close()
+
+    r = Journal(path, resume=True)
+    assert r.get("c1") is not None and "c1" not in r.failed
+    assert r.get("c2") is None and r.failed == {"c2": "HTTP 502"}
+    r.close()
+
+
+def test_torn_and_stray_lines_are_skipped(tmp_path):
+    path = tmp_path / "j.ndjson"
+    j = Journal(str(path))
+    j.record("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    j.record("c2", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    j.close()
+    text = path.read_text(encoding="utf-8")
+    # A crash mid-write leaves half a line; stray non-records are ignored too.
+    path.write_text(text + "[1, 2]\n" + text.splitlines()[1][:25], encoding="utf-8")
+
+    r = Journal(str(path), resume=True)
+    assert len(r) == 2
+    assert r.skipped_lines == 2
+    r.record("c3", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    r.close()
+
+    # Appending after the torn line keeps the new record readable.
+    again = Journal(str(path), resume=True)
+    assert again.get("c3") is not None
+    again.close()
+
+
+def test_records_without_protocol_are_skipped(tmp_path):
+    path = tmp_path / "j.ndjson"
+    lines = [
+        {"compId": "c1", "title": "Cup"},
+        {"compId": "c2", "protocol": [None]},
+        {"compId": "c3", "title": "Cup", "category": "n1", "protocol": [{"userId": "u1", "rank": 1}]},
+    ]
+    path.write_text("".join(json.dumps(rec) + "\n" for rec in lines), encoding="utf-8")
+    r = Journal(str(path), resume=True)
+    assert r.skipped_lines == 2 and len(r) == 1
+    # Written before the date was journaled.
+    assert r.get("c3").date is None
+    r.close()
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / "j.ndjson")
+    j = Journal(path)
+    j.record("c1", "Cup", "n1", "2024-05-01", PROTOCOL, {})
+    j.close()
+    fresh = Journal(path)
+    assert len(fresh) == 0
+    fresh.close()
+    assert open(path, encoding="utf-8").read() == ""
+
+
+def test_records_are_compact_json_lines(tmp_path):
+    path = tmp_path / "j.ndjson"
+    j = Journal(str(path))
+    j.record("c1", "Кубок", "n1", "2024-05-01", FULL, {"u1": "Анна"})
+    j.close()
+    rec = json.loads(path.read_text(encoding="utf-8"))
+    assert rec["protocol"] == [{"userId": "u1", "rank": 1, "points": 10.5, "results": [{"discipline": "log", "value": 100}]}]
+    assert rec["names"] == {"u1": "Анна"} and "Кубок" in path.read_text(encoding="utf-8")
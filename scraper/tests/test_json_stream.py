@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from json_stream import WHOLE, field_spec, ijson, iter_records
+
+BACKENDS = ["full", "python"] + (["ijson"] if ijson is not None else [])
+
+PROTOCOL = {
+    "title": "Cup - n1",
+    "protocol": [
+        {
+            "userId": "u1",
+            "rank": 1,
+            "points": 12.5,
+            "note": 'brackets ] } [ { and "quotes" in a string',
+            "results": [{"discipline": "log", "value": [100, 2]}, {"discipline": "yoke", "value": None}],
+        },
+        {"userId": "u2", "rank": 2, "points": -3e2, "user": {"id": "x", "extra": {"deep": [1, 2]}}},
+        {"userId": "Жук é\\u00e9", "rank": 3, "results": []},
+        {"rank": 4, "flag": True, "nothing": None},
+    ],
+}
+FIELDS = field_spec(["userId", "rank", "points", "user.id", "flag", "nothing"], whole=["results"])
+
+
+def expected(obj, fields):
+    out = {}
+    for key, sub in fields.items():
+        if key not in obj:
+            continue
+        value = obj[key]
+        if sub == WHOLE:
+            out[key] = value
+        elif sub is None:
+            if not isinstance(value, (dict, list)):
+                out[key] = value
+        elif isinstance(value, dict):
+            out[key] = expected(value, sub)
+    return out
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def test_field_spec():
+    assert field_spec(["userId", "user.id"], whole=["results"]) == {
+        "userId": None,
+        "user": {"id": None},
+        "results": WHOLE,
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("chunk", [1, 7, 64 * 1024])
+def test_matches_json_loads(backend, chunk):
+    body = json.dumps(PROTOCOL, ensure_ascii=False).encode()
+    records = list(iter_records(chunked(body, chunk), ("protocol",), FIELDS, backend))
+    assert records == [expected(e, FIELDS) for e in json.loads(body)["protocol"]]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_root_array_and_missing_key(backend):
+    rows = [{"userId": "a", "rank": 1}, {"userId": "b", "rank": 2}]
+    fields = field_spec(["userId"])
+    assert list(iter_records([json.dumps(rows).encode()], ("data",), fields, backend)) == [
+        {"userId": "a"},
+        {"userId": "b"},
+    ]
+    assert list(iter_records([b'{"other": [1, 2]}'], ("data",), fields, backend)) == []
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_first_array_key_in_document_order(backend):
+    body = json.dumps({"meta": {"data": "no"}, "data": [{"id": 1}], "items": [{"id": 2}]}).encode()
+    assert list(iter_records(chunked(body, 3), ("items", "data"), field_spec(["id"]), backend)) == [{"id": 1}]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        list(iter_records([b"[]"], (), {}, "nope"))
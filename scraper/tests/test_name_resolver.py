@@ -0,0 +1,68 @@
+import pickle
+
+from models import ProtocolEntry
+from name_resolver import NameResolver, PendingName, fill_names, has_pending
+
+
+def protocol(*ids):
+    return [ProtocolEntry(uid, rank) for rank, uid in enumerate(ids, 1)]
+
+
+def test_pending_name_reads_as_placeholder():
+    name = PendingName("aaaaaa123456")
+    assert name == "Unknown_123456" and name.user_id == "aaaaaa123456"
+    assert pickle.loads(pickle.dumps(name)).user_id == "aaaaaa123456"
+
+
+def test_fill_names_by_id_even_when_placeholders_collide():
+    # Same last six characters, so the same placeholder text, different athletes.
+    rows = [(PendingName("aaaaaa123456"), "n1"), (PendingName("bbbbbb123456"), "n1"), ("Ann", "h1")]
+    assert has_pending(rows)
+    filled = fill_names(rows, {"aaaaaa123456": "Bob", "bbbbbb123456": "Cid"})
+    assert filled == [("Bob", "n1"), ("Cid", "n1"), ("Ann", "h1")]
+    assert not has_pending(filled)
+    # Unknown ids keep their placeholder.
+    assert fill_names(rows, {}) == [("Unknown_123456", "n1"), ("Unknown_123456", "n1"), ("Ann", "h1")]
+
+
+def test_sources_in_order():
+    resolver = NameResolver()
+    resolver.note_names({"u1": "Ann"})
+    resolver.note_missing(protocol("u1", "u2", "u3", "u4"), {})
+    profiles = []
+
+    def fetch(uid):
+        profiles.append(uid)
+        return {"u3": "Cid"}.get(uid)
+
+    found = resolver.resolve(lambda ids: {"u2": "Bob"} if "u2" in ids else {}, fetch, workers=2)
+    assert found == {"u1": "Ann", "u2": "Bob", "u3": "Cid"}
+    assert resolver.sources == {"run": 1, "store": 1, "profile": 1}
+    assert sorted(profiles) == ["u3", "u4"]
+
+
+def test_lookups_happen_once_per_id_misses_included():
+    resolver = NameResolver()
+    looked_up = []
+
+    def lookup(ids):
+        looked_up.extend(ids)
+        return {"u1": "Ann"} if "u1" in ids else {}
+
+    def fetch(uid):
+        looked_up.append(uid)
+        return None
+
+    resolver.note_missing(protocol("u1", "u2"), {})
+    assert resolver.resolve(lookup, fetch, workers=1) == {"u1": "Ann"}
+    assert sorted(looked_up) == ["u1", "u2", "u2"]
+
+    # Polling again asks nobody; a new id is looked up on its own.
+    assert resolver.resolve(lookup, fetch, workers=1) == {"u1": "Ann"}
+    resolver.note_missing(protocol("u3"), {})
+    resolver.resolve(lookup, fetch, workers=1)
+    assert sorted(looked_up) == ["u1", "u2", "u2", "u3", "u3"]
+
+    # A name that turns up in a later athlete list is still picked up.
+    resolver.note_names({"u2": "Bob"})
+    assert resolver.resolve(lookup, fetch, workers=1) == {"u1": "Ann", "u2": "Bob"}
@@ -0,0 +1,73 @@
+import argparse
+
+import pytest
+
+from rank_merge import kway, merge_ranked, parse_weights
+
+A = [("a1", "n1"), ("a2", "n1"), ("a3", "n1")]
+B = [("b1", "h1")]
+C = [("c1", "n1"), ("c2", "n1")]
+
+
+def test_concat_keeps_url_order():
+    assert list(merge_ranked([A, B, C])) == A + B + C
+
+
+def test_interleave_by_position_then_url_order():
+    assert list(merge_ranked([A, B, C], "interleave")) == [
+        ("a1", "n1"), ("b1", "h1"), ("c1", "n1"),
+        ("a2", "n1"), ("c2", "n1"),
+        ("a3", "n1"),
+    ]
+
+
+def test_round_robin_categories_take_turns():
+    # n1 is seen first; its comps A and C form one stream in URL order.
+    assert list(merge_ranked([A, B, C], "round-robin")) == [
+        ("a1", "n1"), ("b1", "h1"),
+        ("a2", "n1"), ("a3", "n1"), ("c1", "n1"), ("c2", "n1"),
+    ]
+
+
+def test_round_robin_weights():
+    h = [("h%d" % i, "h1") for i in range(4)]
+    n = [("n%d" % i, "n1") for i in range(4)]
+    assert [name for name, _ in merge_ranked([n, h], "round-robin", {"h1": 2})] == [
+        "n0", "h0", "h1", "n1", "h2", "h3", "n2", "n3",
+    ]
+
+
+def test_ties_go_to_lower_stream_index():
+    streams = [[("x", "1"), ("y", "1")], [("p", "2"), ("q", "2")]]
+    assert list(kway(streams, lambda s, pos: (0,))) == [("x", "1"), ("y", "1"), ("p", "2"), ("q", "2")]
+
+
+def test_empty_comps_are_skipped():
+    assert list(merge_ranked([[], A, []], "interleave")) == A
+    assert list(merge_ranked([[], B], "round-robin")) == B
+    assert list(merge_ranked([])) == []
+
+
+def test_streams_lazily():
+    def stream():
+        yield ("a1", "n1")
+        raise AssertionError("read past the first row")
+
+    merged = kway([stream(), iter(B)], lambda s, pos: (pos, s))
+    assert next(merged) == ("a1", "n1")
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        merge_ranked([A], "random")
+
+
+def test_parse_weights():
+    assert parse_weights("n1=2, h1 =3,,r1") == {"n1": 2, "h1": 3, "r1": 1}
+    assert parse_weights(None) == {}
+
+
+@pytest.mark.parametrize("spec", ["n1=x", "n1=1.5", "n1=0", "n1=-2", "=2", "n1=2, =3", "n1="])
+def test_parse_weights_rejects_bad_specs(spec):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_weights(spec)
@@ -0,0 +1,234 @@
+"""
+Local SQLite warehouse of historical protocol ranks, for seeding orderRank.
+
+scrape_one upserts every finished competition (meta + rank per userId), so
+history accumulates across runs. Seeding a new start list is one batched
+query: the list goes into a temp table and is joined against the indexed
+results, rather than one lookup per athlete.
+"""
+import argparse
+import csv
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from models import ProtocolEntry
+from output import read_rows
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS competitions (
+        comp_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        category TEXT NOT NULL,
+        date TEXT NOT NULL,
+        field_size INTEGER NOT NULL,
+        scraped_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS competitions_by_category_date ON competitions (category, date)",
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        comp_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        date TEXT NOT NULL,
+        PRIMARY KEY (comp_id, user_id)
+    ) WITHOUT ROWID
+    """,
+    # Covers the seeding query: user -> category -> date range -> rank.
+    "CREATE INDEX IF NOT EXISTS results_by_user ON results (user_id, category, date, rank)",
+    "CREATE INDEX IF NOT EXISTS results_by_category_date ON results (category, date)",
+    """
+    CREATE TABLE IF NOT EXISTS athletes (
+        user_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS athletes_by_name ON athletes (name_key)",
+)
+
+
+class SeedEntry(NamedTuple):
+    key: str  # userId, or a name when seeding by name
+    category: str
+
+
+class SeedStats(NamedTuple):
+    position: int  # index in the start list
+    key: str
+    category: str
+    starts: int
+    best_rank: Optional[int]
+    avg_rank: Optional[float]
+    # mean of (rank - 1) / (field size - 1): 0 = always first, 1 = always last
+    avg_placing: Optional[float]
+    last_date: Optional[str]
+
+
+def name_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class Warehouse:
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+
+    def record(
+        self,
+        comp_id: str,
+        title: str,
+        category: str,
+        date: str,
+        protocol: List[ProtocolEntry],
+        user_map: Dict[str, str],
+    ) -> None:
+        """
+        Replace everything known about `comp_id` with this protocol (ranks can change).
+        """
+        date = date[:10]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute(
+                    "INSERT INTO competitions (comp_id, title, category, date, field_size, scraped_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(comp_id) DO UPDATE SET title = excluded.title, "
+                    "category = excluded.category, date = excluded.date, field_size = excluded.field_size, "
+                    "scraped_at = excluded.scraped_at",
+                    (comp_id, title, category, date, len(protocol), time.time()),
+                )
+                self._db.execute("DELETE FROM results WHERE comp_id = ?", (comp_id,))
+                self._db.executemany(
+                    "INSERT INTO results (comp_id, user_id, rank, category, date) VALUES (?, ?, ?, ?, ?)",
+                    [(comp_id, e.user_id, e.rank, category, date) for e in protocol],
+                )
+                self._db.executemany(
+                    "INSERT INTO athletes (user_id, name, name_key) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET name = excluded.name, name_key = excluded.name_key",
+                    [(uid, name, name_key(name)) for uid, name in user_map.items()],
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def history(
+        self,
+        entries: Sequence[SeedEntry],
+        by_name: bool = False,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        any_category: bool = False,
+    ) -> List[SeedStats]:
+        """
+        Per-entry rank history in the entry's category (or any category), dates
+        inclusive, in one query. Names match case- and whitespace-insensitively;
+        a name shared by several userIds pools their results.
+        """
+        if by_name:
+            rows = [(i, name_key(e.key), e.category) for i, e in enumerate(entries)]
+            join = "JOIN athletes a ON a.name_key = s.key JOIN results r ON r.user_id = a.user_id"
+        else:
+            rows = [(i, e.key, e.category) for i, e in enumerate(entries)]
+            join = "JOIN results r ON r.user_id = s.key"
+        sql = f"""
+            SELECT s.pos, COUNT(r.rank), MIN(r.rank), AVG(r.rank),
+                   AVG(CAST(r.rank - 1 AS REAL) / MAX(c.field_size - 1, 1)), MAX(r.date)
+            FROM temp.seed s
+            {join}
+            JOIN competitions c ON c.comp_id = r.comp_id
+            WHERE (? OR r.category = s.category) AND r.date >= ? AND r.date <= ?
+            GROUP BY s.pos
+        """
+        with self._lock:
+            self._db.execute("CREATE TEMP TABLE IF NOT EXISTS seed (pos INTEGER PRIMARY KEY, key TEXT, category TEXT)")
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DELETE FROM temp.seed")
+                self._db.executemany("INSERT INTO temp.seed VALUES (?, ?, ?)", rows)
+                found = {
+                    pos: rest
+                    for pos, *rest in self._db.execute(
+                        sql, (1 if any_category else 0, since or "", until or "9999-12-31")
+                    )
+                }
+            finally:
+                self._db.execute("COMMIT")
+        out = []
+        for i, e in enumerate(entries):
+            starts, best, avg, placing, last = found.get(i, (0, None, None, None, None))
+            out.append(SeedStats(i, e.key, e.category, starts, best, avg, placing, last))
+        return out
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM competitions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def seed_order(stats: Sequence[SeedStats], strongest_last: bool = False) -> List[SeedStats]:
+    """
+    Athletes with history by average placing (then best rank, more starts first),
+    followed by newcomers in start-list order. strongest_last flips the ranked part.
+    """
+    ranked = sorted(
+        (s for s in stats if s.starts),
+        key=lambda s: (s.avg_placing, s.best_rank, -s.starts, s.position),
+    )
+    if strongest_last:
+        ranked.reverse()
+    return ranked + [s for s in stats if not s.starts]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Seed a start list from the results warehouse.")
+    p.add_argument("db", help="warehouse file (--warehouse of scraper.py)")
+    p.add_argument("start_list", help="CSV/NDJSON of (name, category), or of (userId, category) with --by-id")
+    p.add_argument("--by-id", action="store_true", help="first column holds userIds, not names")
+    p.add_argument("--since", default=None, metavar="YYYY-MM-DD", help="only comps on/after date")
+    p.add_argument("--until", default=None, metavar="YYYY-MM-DD", help="only comps on/before date")
+    p.add_argument("--any-category", action="store_true", help="count results from every category")
+    p.add_argument("--strongest-last", action="store_true", help="best athletes go last")
+    p.add_argument("--out", default="-", help="seeded CSV with orderRank, '-' for stdout")
+    args = p.parse_args(argv)
+
+    warehouse = Warehouse(args.db)
+    entries = [SeedEntry(key, category) for key, category in read_rows(args.start_list)]
+    started = time.perf_counter()
+    stats = warehouse.history(entries, not args.by_id, args.since, args.until, args.any_category)
+    elapsed = time.perf_counter() - started
+    warehouse.close()
+
+    ordered = seed_order(stats, args.strongest_last)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="", encoding="utf-8")
+    try:
+        w = csv.writer(out)
+        w.writerow(["name" if not args.by_id else "userId", "category", "orderRank", "starts", "best_rank", "avg_rank"])
+        # 0-based, like the orderRank the CSV upload and the Firestore sink assign
+        for order_rank, s in enumerate(ordered):
+            avg = "" if s.avg_rank is None else f"{s.avg_rank:.2f}"
+            w.writerow([s.key, s.category, order_rank, s.starts, "" if s.best_rank is None else s.best_rank, avg])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    known = sum(1 for s in stats if s.starts)
+    print(
+        f"Seeded {len(stats)} athletes ({known} with history) in {elapsed * 1000:.1f} ms",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
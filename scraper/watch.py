@@ -0,0 +1,136 @@
+"""
+Live watch mode: poll protocol endpoints and emit only rank changes.
+
+The watcher keeps the last seen {userId: rank} per competition in memory and,
+on every tick, writes one record per athlete that was added, removed or moved.
+"""
+import csv
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
+
+from models import ProtocolEntry
+
+WATCH_FIELDS = ["ts", "compId", "category", "userId", "name", "change", "rank", "prevRank"]
+
+# (change, userId, rank, prevRank)
+Delta = Tuple[str, str, Optional[int], Optional[int]]
+
+
+def diff_protocol(prev: Dict[str, int], cur: Dict[str, int]) -> List[Delta]:
+    """
+    Compare two {userId: rank} snapshots. Added/changed come in current rank order,
+    removed athletes follow in their previous rank order.
+    """
+    deltas: List[Delta] = []
+    for uid, rank in sorted(cur.items(), key=lambda x: x[1]):
+        old = prev.get(uid)
+        if old is None:
+            deltas.append(("added", uid, rank, None))
+        elif old != rank:
+            deltas.append(("changed", uid, rank, old))
+    for uid, old in sorted(prev.items(), key=lambda x: x[1]):
+        if uid not in cur:
+            deltas.append(("removed", uid, None, old))
+    return deltas
+
+
+class DeltaWriter:
+    def __init__(self, out: IO[str], fmt: str, header: bool = True) -> None:
+        self.out = out
+        self.fmt = fmt
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(out, fieldnames=WATCH_FIELDS)
+            if header:
+                self._csv.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        for rec in records:
+            if self._csv is not None:
+                self._csv.writerow(rec)
+            else:
+                self.out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+
+class ProtocolWatcher:
+    def __init__(
+        self,
+        comp_ids: List[str],
+        fetch_protocol: Callable[[str], List[ProtocolEntry]],
+        writer: DeltaWriter,
+        labels: Optional[Dict[str, Tuple[str, Dict[str, str]]]] = None,
+        workers: int = 6,
+    ) -> None:
+        """
+        `fetch_protocol(comp_id)` returns the comp's protocol entries;
+        `labels` maps comp_id -> (category, {userId: name}) for nicer records.
+        """
+        self.comp_ids = comp_ids
+        self.fetch_protocol = fetch_protocol
+        self.writer = writer
+        self.labels = labels or {}
+        self.workers = workers
+        self.state: Dict[str, Dict[str, int]] = {}
+
+    def _poll(self, comp_id: str) -> Optional[Dict[str, int]]:
+        try:
+            return {e.user_id: e.rank for e in self.fetch_protocol(comp_id)}
+        except Exception as e:
+            print(f"[ERR] watch compId={comp_id} -> {e}", file=sys.stderr)
+            return None
+
+    def tick(self) -> int:
+        """
+        Poll every competition once and write its deltas. Returns the number written.
+        A failed poll keeps the previous state so nothing is reported as removed.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            snapshots = list(ex.map(self._poll, self.comp_ids))
+
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        records: List[Dict[str, Any]] = []
+        for comp_id, cur in zip(self.comp_ids, snapshots):
+            if cur is None:
+                continue
+            category, user_map = self.labels.get(comp_id, ("", {}))
+            for change, uid, rank, prev_rank in diff_protocol(self.state.get(comp_id, {}), cur):
+                records.append(
+                    {
+                        "ts": ts,
+                        "compId": comp_id,
+                        "category": category,
+                        "userId": uid,
+                        "name": user_map.get(uid, ""),
+                        "change": change,
+                        "rank": rank,
+                        "prevRank": prev_rank,
+                    }
+                )
+            self.state[comp_id] = cur
+        self.writer.write(records)
+        return len(records)
+
+    def run(self, interval: float, jitter: float = 0.2, ticks: Optional[int] = None) -> None:
+        """
+        Tick every `interval` seconds (+/- `jitter` fraction) until interrupted
+        or `ticks` polls have been made.
+        """
+        n = 0
+        try:
+            while ticks is None or n < ticks:
+                started = time.monotonic()
+                count = self.tick()
+                n += 1
+                print(f"[WATCH] tick {n}: {count} change(s)", file=sys.stderr)
+                if ticks is not None and n >= ticks:
+                    break
+                delay = interval * random.uniform(1 - jitter, 1 + jitter)
+                time.sleep(max(0.0, delay - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\n[WATCH] stopped", file=sys.stderr)